@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Code partagé par les pages Streamlit (accès aux données, caches, calculs communs)."""
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de démarrage à froid des pages, avec un budget par page.
+
+Chaque page est mesurée dans un processus Python neuf (comme après un
+redémarrage du serveur) :
+
+    import_s  temps des imports de la page (ses lignes ``import`` / ``from``)
+    render_s  premier rendu complet (AppTest), caches de données vides
+    rerun_s   rendu suivant dans le même processus (caches chauds)
+
+Streamlit et AppTest sont importés avant la mesure : ce coût est celui du
+serveur, pas de la page. Le script échoue (code 1) si une page dépasse son
+budget ou lève une exception. Lancer depuis la racine du dépôt :
+
+    python -m core.bench_startup
+    python -m core.bench_startup --runs 3 --output bench_startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Budgets en secondes : (imports, premier rendu). Les imports (~0.5 s) sont surtout
+# pandas / pyarrow ; plotly est importé au premier graphique, nba_api (~0.6 s) jamais.
+BUDGETS = {
+    "home.py":                   (0.8, 0.5),
+    "pages/1_Team.py":           (0.8, 1.5),
+    "pages/2_Statistics.py":     (0.8, 0.6),
+    "pages/3_Champ_Historic.py": (0.8, 1.5),
+    "pages/4_Trade_Machine.py":  (0.8, 0.6),
+}
+
+# Exécuté dans le processus enfant
+_CHILD = r"""
+import ast, json, sys, time
+from streamlit.testing.v1 import AppTest
+
+page = sys.argv[1]
+with open(page, encoding="utf-8") as f:
+    tree = ast.parse(f.read())
+imports = [ast.unparse(n) for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+
+start = time.perf_counter()
+for stmt in imports:
+    exec(stmt, {})
+import_s = time.perf_counter() - start
+
+at = AppTest.from_file("home.py", default_timeout=120)
+if page != "home.py":
+    at.switch_page(page)
+start = time.perf_counter()
+at.run()
+render_s = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun_s = time.perf_counter() - start
+
+print(json.dumps({"import_s": import_s, "render_s": render_s, "rerun_s": rerun_s,
+                  "exceptions": [e.message for e in at.exception]}))
+"""
+
+
+def measure(page: str) -> dict:
+    """Une mesure à froid de ``page`` dans un processus neuf."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, page],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(pages: list[str], runs: int = 1) -> list[dict]:
+    """Médiane de ``runs`` mesures par page, comparée au budget."""
+    results = []
+    for page in pages:
+        samples = [measure(page) for _ in range(runs)]
+        budget_import, budget_render = BUDGETS[page]
+        row = {
+            "page": page,
+            **{k: round(statistics.median(s[k] for s in samples), 3) for k in ("import_s", "render_s", "rerun_s")},
+            "budget_import_s": budget_import,
+            "budget_render_s": budget_render,
+            "exceptions": sorted({e for s in samples for e in s["exceptions"]}),
+        }
+        row["ok"] = (row["import_s"] <= budget_import and row["render_s"] <= budget_render
+                     and not row["exceptions"])
+        results.append(row)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Temps d'import et de premier rendu de chaque page, vs budget.")
+    parser.add_argument("pages", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--runs", type=int, default=1, help="mesures par page (médiane)")
+    parser.add_argument("--output", help="enregistre les résultats en JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.pages, args.runs)
+    print(f"{'page':28} {'import':>8} {'rendu':>8} {'rerun':>8}  budget")
+    for r in results:
+        status = "OK" if r["ok"] else "DÉPASSÉ" if not r["exceptions"] else "ERREUR"
+        print(f"{r['page']:28} {r['import_s']:8.3f} {r['render_s']:8.3f} {r['rerun_s']:8.3f}  "
+              f"{r['budget_import_s']:.1f} / {r['budget_render_s']:.1f}  {status}")
+        for e in r["exceptions"]:
+            print(f"    {e.splitlines()[0]}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
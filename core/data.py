@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Couche d'accès aux données partagée par toutes les pages.
+
+Les données viennent de la génération publiée courante (data/current, voir
+data_processing/generations.py) : une génération n'est jamais modifiée, et
+les caches sont indexés par son identifiant, donc une table ou une requête
+vient toujours d'une génération complète, jamais d'un export à moitié écrit.
+
+Chaque table est lue une seule fois par contenu (hash du manifeste : une table
+inchangée d'une génération à l'autre n'est pas relue) et par processus serveur,
+en mémoire Arrow, et conservée dans ``st.cache_resource`` : toutes les
+sessions partagent les mêmes buffers au lieu de recevoir chacune une copie
+picklée (``st.cache_data``). ``table()`` renvoie une vue pandas adossée à
+Arrow (``pd.ArrowDtype``), sans copie des données.
+
+Un watcher léger (un thread par processus) relit le pointeur toutes les
+``WATCH_INTERVAL`` secondes. Quand une nouvelle génération est publiée (ou
+après un rollback), il la charge entièrement en arrière-plan (tables,
+connexion DuckDB, index enregistrés via ``on_new_version``) puis bascule
+``version()`` dessus : les caches vivent tant que les données ne changent pas
+et aucun visiteur n'attend le rechargement.
+
+Les buffers Arrow sont immuables et le mode copy-on-write de pandas est
+activé : une page qui modifie « sa » vue (nouvelle colonne, ``replace``...)
+ne touche jamais la table partagée.
+
+    from core import data
+    df_players = data.table("reg_season_players_filtered")
+    df_top = data.query("SELECT ... FROM players WHERE TEAM_KEY = ?", [key])
+"""
+
+import os
+import threading
+import time
+from functools import partial
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from data_processing import dataset, generations, teams, warehouse
+
+# Les vues partagées ne doivent jamais être modifiées en place
+pd.set_option("mode.copy_on_write", True)
+
+
+# -------------------------------
+# Version des données
+# -------------------------------
+WATCH_INTERVAL = 5.0  # secondes entre deux lectures de data/current
+
+_served: str | None = None          # génération servie aux pages
+_served_lock = threading.Lock()
+_warmers: list[Callable[[str], object]] = []
+
+
+def version() -> str:
+    """Identifiant de la génération servie : sert de clé aux caches et aux index
+    précalculés. Ne change qu'une fois la nouvelle génération chargée par le watcher."""
+    global _served
+    _watcher()
+    if _served is None:
+        with _served_lock:
+            if _served is None:
+                _served = generations.current()
+    return _served
+
+
+def on_new_version(warm: Callable[[str], object]) -> None:
+    """Enregistre un préchargement exécuté par le watcher pour chaque nouvelle génération
+    (ex. index de classements), avant qu'elle ne soit servie."""
+    _warmers.append(warm)
+
+
+def load_steps(generation: str) -> list[tuple[str, Callable[[], object]]]:
+    """Étapes (libellé, fonction) pour charger tout ce que les pages lisent d'une génération :
+    chaque table, la connexion DuckDB, puis les préchargements enregistrés."""
+    steps = [
+        (f"table {filename}", partial(_frame, generation, filename.removeprefix("df_").removesuffix(".parquet")))
+        for filename in _manifest(generation)["files"] if filename.endswith(".parquet")
+    ]
+    steps.append(("DuckDB", partial(_warm_db, generation)))
+    steps += [(f"{warm.__module__}", partial(warm, generation)) for warm in list(_warmers)]
+    return steps
+
+
+def _load(generation: str) -> None:
+    """Charge une génération hors du chemin des requêtes."""
+    for _, step in load_steps(generation):
+        step()
+
+
+def _watch() -> None:
+    global _served
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        try:
+            latest = generations.current()
+            if _served is not None and latest != _served:
+                _load(latest)
+                _served = latest
+        except Exception as e:  # génération illisible : on continue de servir l'ancienne
+            print(f"[data] génération non chargée : {e}")
+
+
+@st.cache_resource(show_spinner=False)
+def _watcher() -> threading.Thread:
+    thread = threading.Thread(target=_watch, name="data-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+# -------------------------------
+# Tables Parquet (une lecture par contenu et par processus)
+# -------------------------------
+# Les caches sont indexés par le hash du fichier (manifeste), pas par la génération :
+# une table inchangée d'une génération à l'autre (liée par le pipeline) n'est pas relue.
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _manifest(generation: str) -> dict:
+    return generations.read_manifest(generation)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _arrow_table(sha256: str, _path: str) -> pa.Table:
+    return pq.read_table(_path)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _frame_by_hash(sha256: str, _path: str) -> pd.DataFrame:
+    # Colonnes adossées aux buffers Arrow (zéro copie) ; clés d'équipe en catégoriel
+    return teams.categorize(_arrow_table(sha256, _path).to_pandas(types_mapper=pd.ArrowDtype))
+
+
+def _frame(generation: str, name: str) -> pd.DataFrame:
+    file_path = dataset.path(name, generations.path(generation))
+    return _frame_by_hash(_manifest(generation)["files"][os.path.basename(file_path)]["sha256"], file_path)
+
+
+def table(name: str, generation: str | None = None) -> pd.DataFrame:
+    """Vue en lecture seule (copy-on-write) sur la table partagée ``name``
+    (de la génération servie, ou de ``generation``)."""
+    return _frame(generation or version(), name).copy(deep=False)
+
+
+def affichage(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie de ``df`` pour ``st.dataframe`` : sans les clés d'équipe internes, et en
+    types numpy pour que les valeurs manquantes s'affichent comme dans les anciennes
+    vues (vides) et non ``<NA>``."""
+    out = df.drop(columns=[c for c in teams.KEY_COLUMNS if c in df.columns])
+    for col in out.columns:
+        dtype = out[col].dtype
+        if not isinstance(dtype, pd.ArrowDtype):
+            continue
+        if out[col].notna().all() and dtype.numpy_dtype.kind in "biuf":
+            out[col] = out[col].to_numpy(dtype=dtype.numpy_dtype)
+        elif dtype.numpy_dtype.kind in "iuf":
+            out[col] = out[col].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            out[col] = out[col].to_numpy(dtype=object, na_value=None)
+    return out
+
+
+# -------------------------------
+# DuckDB (une connexion en lecture seule par génération et par processus)
+# -------------------------------
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _db(generation: str):
+    return warehouse.connect(generation)
+
+
+def db():
+    return _db(version())
+
+
+def _warm_db(generation: str) -> None:
+    # Ouvre la connexion et lit une fois chaque table / vue (catalogue et pages en mémoire)
+    con = _db(generation)
+    for name in ("players", "salaries_long", "standings", "champions"):
+        warehouse.query(con, f"SELECT COUNT(*) FROM {name}")
+
+
+def query(sql: str, params: list | dict | None = None) -> pd.DataFrame:
+    """Requête SQL sur le nba.duckdb de la génération courante (filtres, tris et agrégations poussés dans DuckDB)."""
+    return warehouse.query(db(), sql, params)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Cache des graphiques Plotly, partagé par toutes les pages et sessions.
+
+Un graphique est identifié par (version des données, type, paramètres). La
+première demande exécute la fonction de construction (agrégation pandas +
+figure Plotly) et seul le JSON de la figure est conservé. Les vues suivantes,
+quel que soit le visiteur, relisent ce JSON : ni agrégation, ni construction.
+
+La fonction de construction lit elle-même ses données (``data.table``,
+index de classements...) à partir de ses paramètres, pour que rien ne soit
+calculé quand le graphique est déjà en cache. Comme pour ``st.cache_*``, un
+paramètre préfixé par ``_`` est transmis sans faire partie de la clé : une
+page qui a déjà chargé les données les passe ainsi au lieu de les relire.
+
+    spec = figures.figure("titres_par_equipe", graphique_titres)
+    spec = figures.figure("salaires_par_position", graphique_salaires, team_key=24, year="2025-26",
+                          _salaires=df_team_year)
+    st.plotly_chart(spec, use_container_width=True)
+"""
+
+import json
+from typing import Callable
+
+import streamlit as st
+
+from core import data
+
+
+@st.cache_resource(show_spinner=False, max_entries=1024)
+def _spec_json(version: str, kind: str, params: tuple, _build: Callable, _extra: dict) -> str | None:
+    fig = _build(**dict(params), **_extra)
+    return None if fig is None else fig.to_json()
+
+
+def figure(kind: str, build: Callable, **params) -> dict | None:
+    """Spécification de la figure ``kind`` pour ces paramètres (None si ``build`` n'a rien à tracer)."""
+    key = {k: v for k, v in params.items() if not k.startswith("_")}
+    extra = {k: v for k, v in params.items() if k.startswith("_")}
+    spec = _spec_json(data.version(), kind, tuple(sorted(key.items())), build, extra)
+    return None if spec is None else json.loads(spec)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Index de classements (top-k) précalculé, partagé par toutes les pages.
+
+Pour une partie de saison et un filtre qualité (GP minimum, MIN_PG > 10),
+chaque colonne de stat numérique (PTS, PTS_PG, PTS_P36, FG_PCT, ...) a son
+ordre de tri décroissant calculé une fois par version des données :
+
+    order[stat]       positions des joueurs, meilleur en premier (toute la ligue)
+    team_order[stat]  mêmes positions regroupées par équipe, meilleur en premier
+    team_bounds       début / fin de chaque équipe dans team_order
+
+Un top-k est alors une simple tranche, quel que soit le nombre de saisons
+chargées :
+
+    board = leaderboards.board("Regular Season")
+    board.top("PTS_PG", 30)
+    board.top("AST_PG", 3, team=teams.key("BOS"))
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from core import data
+from data_processing import teams
+
+SEASON_TABLES = {
+    "Regular Season": "reg_season_players_filtered",
+    "Playoffs": "playoff_players_filtered",
+}
+
+# Colonnes numériques qui ne sont pas des stats à classer
+NOT_RANKED = {"PLAYER_ID", "TEAM_KEY", "AGE", "W", "L", "W_PCT", "WEIGHT",
+              "DRAFT_YEAR", "DRAFT_ROUND", "DRAFT_NUMBER"}
+
+
+@dataclass(frozen=True)
+class Board:
+    rows: pd.DataFrame
+    order: dict[str, np.ndarray]
+    team_order: dict[str, np.ndarray]
+    team_bounds: dict[str, np.ndarray]
+
+    @property
+    def stats(self) -> list[str]:
+        return list(self.order)
+
+    def positions(self, stat: str, k: int | None = None, team: int | None = None) -> np.ndarray:
+        """Positions (dans ``rows``) des k meilleurs pour ``stat``, éventuellement dans une équipe."""
+        if team is None:
+            return self.order[stat][:k]
+        code = teams.KEY_DTYPE.categories.get_loc(team)
+        lo, hi = self.team_bounds[stat][code], self.team_bounds[stat][code + 1]
+        return self.team_order[stat][lo:hi][:k]
+
+    def top(self, stat: str, k: int | None = None, team: int | None = None) -> pd.DataFrame:
+        """Les k meilleures lignes pour ``stat`` (toute la ligue ou une équipe), déjà triées."""
+        return self.rows.iloc[self.positions(stat, k, team)]
+
+    def best(self, stat: str, team: int | None = None) -> pd.Series | None:
+        """La meilleure ligne pour ``stat`` (équivalent de idxmax), ou None."""
+        pos = self.positions(stat, 1, team)
+        return self.rows.iloc[pos[0]] if len(pos) else None
+
+
+def _numpy_backed(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie en colonnes NumPy : un iloc de k lignes y est ~20x plus rapide que sur des colonnes Arrow."""
+    return pd.DataFrame({
+        col: pa.array(s).to_pandas() if isinstance(s.dtype, pd.ArrowDtype) else s.reset_index(drop=True)
+        for col, s in df.items()
+    })
+
+
+def build_board(df: pd.DataFrame) -> Board:
+    """Ordres de tri de toutes les stats numériques de ``df`` (NaN en dernier, tri stable)."""
+    rows = _numpy_backed(df)
+    codes = rows["TEAM_KEY"].cat.codes.to_numpy() if "TEAM_KEY" in rows else np.full(len(rows), -1)
+    n_teams = len(teams.KEY_DTYPE.categories)
+
+    order, team_order, team_bounds = {}, {}, {}
+    for col in rows.columns:
+        if col in NOT_RANKED or not pd.api.types.is_numeric_dtype(rows[col]) \
+                or pd.api.types.is_bool_dtype(rows[col]):
+            continue
+        values = rows[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        key = np.where(np.isnan(values), np.inf, -values)   # décroissant, NaN à la fin
+        order[col] = np.argsort(key, kind="stable")
+        by_team = np.lexsort((key, codes))                  # équipe, puis stat décroissante
+        team_order[col] = by_team[codes[by_team] >= 0]
+        team_bounds[col] = np.searchsorted(codes[team_order[col]], np.arange(n_teams + 1))
+    return Board(rows, order, team_order, team_bounds)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _board(version: str, season_type: str, min_gp: int) -> Board:
+    df = data.table(SEASON_TABLES[season_type], version)
+    return build_board(df[(df["GP"] >= min_gp) & (df["MIN_PG"] > 10)])
+
+
+def board(season_type: str, min_gp: int = 11) -> Board:
+    """Index de la partie de saison ``season_type`` (joueurs avec GP >= min_gp et MIN_PG > 10),
+    construit une fois par version des données et partagé par toutes les sessions."""
+    return _board(data.version(), season_type, min_gp)
+
+
+# Index utilisés par les pages (home / Statistiques : GP > 10 ; Équipe en playoffs : GP >= 4),
+# reconstruits par le watcher avant qu'une nouvelle génération ne soit servie
+PAGE_BOARDS = [("Regular Season", 11), ("Playoffs", 11), ("Playoffs", 4)]
+
+
+def _warm(version: str) -> None:
+    for season_type, min_gp in PAGE_BOARDS:
+        _board(version, season_type, min_gp)
+
+
+data.on_new_version(_warm)
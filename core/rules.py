@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""Moteur de règles des échanges, évalué sur des tableaux d'échanges en une passe.
+
+Un lot d'échanges est décrit par ses mouvements de joueurs, trois tableaux de
+même longueur : ``echange`` (numéro de l'échange, 0..n-1), ``rows`` (ligne du
+joueur dans la matrice des salaires, voir core.trades) et ``destinations``
+(TEAM_KEY qui le reçoit ; l'équipe d'origine est celle du contrat). Pour
+chaque échange, équipe et saison, ``evaluer`` calcule en quelques opérations
+NumPy les salaires cédés / reçus, l'effectif après l'échange et les verdicts :
+
+    salaires   |reçu - cédé| <= tolérance x max(reçu, cédé) + coussin, le palier
+               (tolérance, coussin) dépendant du salaire cédé
+    effectif   effectif_min <= effectif après <= effectif_max (une équipe déjà
+               hors limites peut échanger, tant que l'échange ne l'en éloigne pas) ;
+               sans effectif_max (défaut), seuls les salaires sont vérifiés
+
+Les règles sont configurables (``Regles``, ou un fichier JSON pour la ligne de
+commande). Valider un tableur d'échanges (CSV : TRADE_ID, PLAYER, TEAM, TO,
+un joueur par ligne) sans lancer l'application, depuis la racine du dépôt :
+
+    python -m core.rules echanges.csv --output verdicts.csv
+    python -m core.rules echanges.csv --all-seasons --rules regles.json
+"""
+
+import argparse
+import json
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from data_processing import contracts, dataset, generations, teams
+
+NB_CLES = len(teams.TEAMS) + 1  # TEAM_KEY 1..30, 0 = équipe inconnue
+
+
+# -------------------------------
+# Règles
+# -------------------------------
+@dataclass(frozen=True)
+class Palier:
+    seuil: int            # salaire cédé à partir duquel le palier s'applique
+    tolerance: float      # écart relatif maximal |reçu - cédé| / max(reçu, cédé)
+    coussin: int = 0      # écart absolu toléré en plus ($)
+
+
+@dataclass(frozen=True)
+class Regles:
+    paliers: tuple[Palier, ...] = (Palier(0, 0.05),)
+    effectif_min: int = 0
+    effectif_max: int | None = None  # None : pas de limite d'effectif
+
+    @classmethod
+    def depuis_json(cls, path: str) -> "Regles":
+        """Règles d'un fichier JSON : {"paliers": [{"seuil": 0, "tolerance": 0.05, "coussin": 0}, ...],
+        "effectif_min": 0, "effectif_max": 15} (clés absentes : valeurs par défaut)."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        paliers = tuple(sorted((Palier(**p) for p in config.pop("paliers", [])), key=lambda p: p.seuil))
+        return cls(paliers=paliers or cls.paliers, **config)
+
+    def palier(self, cede: int) -> Palier:
+        """Palier applicable à une équipe qui cède ``cede`` $."""
+        applicables = [p for p in self.paliers if p.seuil <= cede]
+        return applicables[-1] if applicables else self.paliers[0]
+
+    def libelle(self) -> str:
+        """Règle des salaires en clair, ex. « ±5% » ou « ±25% + $100,000, ±5% à partir de $7,500,000 »."""
+        return ", ".join(
+            f"±{p.tolerance * 100:g}%" + (f" + ${p.coussin:,}" if p.coussin else "")
+            + (f" à partir de ${p.seuil:,}" if p.seuil > 0 else "")
+            for p in self.paliers
+        )
+
+
+# Règles par défaut (application et ligne de commande) : correspondance des salaires seule
+REGLES = Regles()
+
+
+def bande(cede: int, regles: Regles = REGLES) -> tuple[int, int]:
+    """Salaires reçus acceptables pour une équipe qui cède ``cede`` $ :
+    |reçu - cédé| <= tolérance x max(reçu, cédé) + coussin, avec le palier de ``cede``."""
+    p = regles.palier(cede)
+    return max(math.ceil(cede * (1 - p.tolerance) - p.coussin), 0), math.floor((cede + p.coussin) / (1 - p.tolerance))
+
+
+def conforme(sortant: np.ndarray, entrant: np.ndarray, regles: Regles = REGLES) -> np.ndarray:
+    """Règle des salaires, élément par élément, pour des salaires cédés / reçus (palier choisi par le salaire cédé)."""
+    seuils = np.array([p.seuil for p in regles.paliers])
+    palier = np.clip(np.searchsorted(seuils, sortant, side="right") - 1, 0, None)
+    tolerance = np.array([p.tolerance for p in regles.paliers])[palier]
+    coussin = np.array([p.coussin for p in regles.paliers])[palier]
+    return np.abs(entrant - sortant) <= tolerance * np.maximum(sortant, entrant) + coussin
+
+
+# -------------------------------
+# Évaluation vectorisée
+# -------------------------------
+@dataclass(frozen=True)
+class Verdicts:
+    """Résultats d'un lot de n échanges : tableaux (échanges x équipes x saisons), équipes indexées par TEAM_KEY."""
+    regles: Regles
+    implique: np.ndarray       # bool (échanges x équipes), l'équipe cède ou reçoit un joueur
+    sortant: np.ndarray        # int64, salaires cédés
+    entrant: np.ndarray        # int64, salaires reçus
+    effectif_avant: np.ndarray # int64 (équipes x saisons), joueurs sous contrat
+    effectif: np.ndarray       # int64, effectif après l'échange
+    ecart: np.ndarray          # |reçu - cédé| / max, NaN si aucun salaire n'est échangé
+    ok_salaires: np.ndarray    # bool
+    ok_effectif: np.ndarray    # bool
+    erreurs: list[list[str]] = field(default_factory=list)  # par échange, mouvements impossibles
+
+    @property
+    def valide(self) -> np.ndarray:
+        """Verdict (échanges x saisons) : toutes les équipes impliquées respectent toutes les règles."""
+        ok = (self.ok_salaires & self.ok_effectif) | ~self.implique[:, :, None]
+        sans_erreur = np.array([not e for e in self.erreurs]) if self.erreurs else np.ones(len(ok), bool)
+        return ok.all(axis=1) & sans_erreur[:, None]
+
+    def motifs(self, echange: int, saison: int) -> list[str]:
+        """Raisons lisibles du refus de ``echange`` pour la colonne ``saison`` (vide si valide)."""
+        motifs = list(self.erreurs[echange]) if self.erreurs else []
+        for cle in np.flatnonzero(self.implique[echange]):
+            tm = teams.ABBREVIATION.get(int(cle), "?")
+            if not self.ok_salaires[echange, cle, saison]:
+                motifs.append(f"{tm} : écart de salaires {self.ecart[echange, cle, saison]:.2%} "
+                              f"(cédé {self.sortant[echange, cle, saison]:,} / reçu {self.entrant[echange, cle, saison]:,})")
+            if not self.ok_effectif[echange, cle, saison]:
+                limite = "" if self.regles.effectif_max is None else self.regles.effectif_max
+                motifs.append(f"{tm} : effectif de {self.effectif[echange, cle, saison]} joueurs "
+                              f"(limites {self.regles.effectif_min}-{limite})")
+        return motifs
+
+
+def evaluer(salaries: np.ndarray, team: np.ndarray, echange: np.ndarray, rows: np.ndarray,
+            destinations: np.ndarray, nb_echanges: int | None = None, regles: Regles = REGLES,
+            erreurs: list[list[str]] | None = None) -> Verdicts:
+    """Applique ``regles`` à tous les échanges d'un lot à la fois.
+
+    ``salaries`` / ``team`` sont la matrice des salaires (contrats x saisons) et
+    le TEAM_KEY de chaque contrat (core.trades.Contrats). Les sommes par
+    (échange, équipe) sont des ``np.add.at`` sur un index aplati ; les paliers
+    sont choisis par ``searchsorted`` sur leurs seuils.
+    """
+    echange, rows = np.asarray(echange, np.int64), np.asarray(rows, np.int64)
+    destinations = np.asarray(destinations, np.int64)
+    n = int(nb_echanges if nb_echanges is not None else (echange.max() + 1 if len(echange) else 0))
+    nb_saisons = salaries.shape[1]
+    origine = team[rows].astype(np.int64)
+    montants = salaries[rows]                       # (mouvements, saisons)
+    sous_contrat = (montants > 0).astype(np.int64)
+
+    sortant = np.zeros((n * NB_CLES, nb_saisons), np.int64)
+    entrant = np.zeros_like(sortant)
+    cedes = np.zeros_like(sortant)
+    recus = np.zeros_like(sortant)
+    np.add.at(sortant, echange * NB_CLES + origine, montants)
+    np.add.at(entrant, echange * NB_CLES + destinations, montants)
+    np.add.at(cedes, echange * NB_CLES + origine, sous_contrat)
+    np.add.at(recus, echange * NB_CLES + destinations, sous_contrat)
+    sortant, entrant, cedes, recus = (a.reshape(n, NB_CLES, nb_saisons) for a in (sortant, entrant, cedes, recus))
+
+    implique = np.zeros(n * NB_CLES, bool)
+    implique[echange * NB_CLES + origine] = True
+    implique[echange * NB_CLES + destinations] = True
+    implique = implique.reshape(n, NB_CLES)
+
+    # Salaires : palier choisi par le salaire cédé
+    plus_grand = np.maximum(sortant, entrant)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ecart = np.where(plus_grand > 0, np.abs(entrant - sortant) / plus_grand, np.nan)
+    ok_salaires = conforme(sortant, entrant, regles)
+
+    # Effectifs : joueurs sous contrat par équipe et saison, avant / après
+    effectif_avant = np.zeros((NB_CLES, nb_saisons), np.int64)
+    np.add.at(effectif_avant, team.astype(np.int64), (salaries > 0).astype(np.int64))
+    effectif = effectif_avant[None] - cedes + recus
+    effectif_max = np.iinfo(np.int64).max if regles.effectif_max is None else regles.effectif_max
+    ok_effectif = (((effectif <= effectif_max) | (effectif <= effectif_avant))
+                   & ((effectif >= regles.effectif_min) | (effectif >= effectif_avant)))
+
+    return Verdicts(regles, implique, sortant, entrant, effectif_avant, effectif, ecart,
+                    ok_salaires, ok_effectif, erreurs or [[] for _ in range(n)])
+
+
+# -------------------------------
+# Validation d'un fichier d'échanges
+# -------------------------------
+def lire_mouvements(df: pd.DataFrame, df_contrats: pd.DataFrame) -> tuple[list, np.ndarray, np.ndarray, np.ndarray, list]:
+    """Mouvements d'un tableur (TRADE_ID, PLAYER, TEAM, TO) -> identifiants, tableaux du lot, erreurs.
+
+    Les joueurs sont retrouvés par (PLAYER, équipe d'origine) dans les contrats ;
+    TEAM / TO acceptent toutes les graphies connues (BOS, PHO, Boston Celtics...).
+    Les échanges gardent l'ordre du fichier ; un mouvement impossible (joueur ou
+    équipe inconnus...) devient un motif de refus de son échange.
+    """
+    echange, ids = pd.factorize(df["TRADE_ID"].astype(str), sort=False)
+    mouvements = pd.DataFrame({
+        "ECHANGE": echange,
+        "PLAYER": df["PLAYER"].astype(str).str.strip().to_numpy(),
+        "ORIGINE": df["TEAM"].map(teams.key).to_numpy(),
+        "DESTINATION": df["TO"].map(teams.key).to_numpy(),
+    })
+    index = pd.DataFrame({"PLAYER": df_contrats["PLAYER"].to_numpy(),
+                          "ORIGINE": df_contrats["TEAM_KEY"].astype("Int8").to_numpy(),
+                          "ROW": np.arange(len(df_contrats))}).dropna(subset=["ORIGINE"])
+    index = index.drop_duplicates(["PLAYER", "ORIGINE"])  # contrats sans équipe : jamais échangeables
+    mouvements = mouvements.merge(index.astype({"ORIGINE": object}), on=["PLAYER", "ORIGINE"], how="left")
+
+    erreurs = [[] for _ in ids]
+    inconnus = mouvements["ROW"].isna() | mouvements["DESTINATION"].isna() | mouvements["ORIGINE"].isna()
+    meme_equipe = mouvements["ORIGINE"] == mouvements["DESTINATION"]
+    doublons = mouvements.duplicated(["ECHANGE", "ROW"], keep="first") & ~inconnus
+    for i, ligne in mouvements[inconnus | meme_equipe | doublons].iterrows():
+        if pd.isna(ligne["ORIGINE"]):
+            motif = f"{ligne['PLAYER']} : équipe d'origine inconnue"
+        elif pd.isna(ligne["ROW"]):
+            motif = f"{ligne['PLAYER']} : joueur introuvable dans cette équipe"
+        elif pd.isna(ligne["DESTINATION"]):
+            motif = f"{ligne['PLAYER']} : équipe de destination inconnue"
+        elif meme_equipe[i]:
+            motif = f"{ligne['PLAYER']} : destination identique à l'équipe d'origine"
+        else:
+            motif = f"{ligne['PLAYER']} : cédé deux fois dans le même échange"
+        erreurs[ligne["ECHANGE"]].append(motif)
+
+    valides = mouvements[~(inconnus | meme_equipe | doublons)]
+    return (list(ids), valides["ECHANGE"].to_numpy(np.int64), valides["ROW"].to_numpy(np.int64),
+            valides["DESTINATION"].to_numpy(np.int64), erreurs)
+
+
+def valider_fichier(df: pd.DataFrame, df_contrats: pd.DataFrame, saisons: list[str],
+                    regles: Regles = REGLES) -> pd.DataFrame:
+    """Verdict par échange et saison : TRADE_ID, SEASON, VALID, TEAMS, MAX_DIFF_PCT, REASONS."""
+    ids, echange, rows, destinations, erreurs = lire_mouvements(df, df_contrats)
+    salaries = np.ascontiguousarray(df_contrats[contracts.SEASONS].to_numpy("int64"))
+    team = df_contrats["TEAM_KEY"].astype("Int8").fillna(0).to_numpy("int8")
+    verdicts = evaluer(salaries, team, echange, rows, destinations, len(ids), regles, erreurs)
+
+    colonnes = [contracts.SEASONS.index(s) for s in saisons]
+    valide = verdicts.valide
+    equipes = [",".join(teams.ABBREVIATION.get(int(c), "?") for c in np.flatnonzero(verdicts.implique[e]))
+               for e in range(len(ids))]
+    lignes = []
+    for e, trade_id in enumerate(ids):
+        for j, saison in zip(colonnes, saisons):
+            ecarts = verdicts.ecart[e, verdicts.implique[e], j]
+            lignes.append({
+                "TRADE_ID": trade_id,
+                "SEASON": saison,
+                "VALID": bool(valide[e, j]),
+                "TEAMS": equipes[e],
+                "MAX_DIFF_PCT": round(float(np.nanmax(ecarts)), 4) if np.isfinite(ecarts).any() else None,
+                "REASONS": " | ".join(verdicts.motifs(e, j)),
+            })
+    return pd.DataFrame(lignes)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Valide un fichier CSV d'échanges (un joueur par ligne) "
+                                                 "et écrit un verdict par échange.")
+    parser.add_argument("trades", help="CSV avec les colonnes TRADE_ID, PLAYER, TEAM, TO")
+    parser.add_argument("--output", help="CSV des verdicts (défaut : <trades>_verdicts.csv)")
+    parser.add_argument("--season", default=contracts.SEASONS[0], choices=contracts.SEASONS)
+    parser.add_argument("--all-seasons", action="store_true", help="un verdict par saison de contrat")
+    parser.add_argument("--rules", help="règles en JSON (paliers, effectif_min, effectif_max)")
+    parser.add_argument("--generation", help="génération de données (défaut : la génération courante)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    regles = Regles.depuis_json(args.rules) if args.rules else REGLES
+    df_contrats = dataset.read("contracts", directory=generations.path(args.generation) if args.generation else None)
+    df = pd.read_csv(args.trades)
+    saisons = contracts.SEASONS if args.all_seasons else [args.season]
+    resultats = valider_fichier(df, df_contrats, saisons, regles)
+
+    output = args.output or args.trades.removesuffix(".csv") + "_verdicts.csv"
+    resultats.to_csv(output, index=False)
+    nb = resultats["TRADE_ID"].nunique()
+    print(f"{nb} échanges, {int(resultats['VALID'].sum())} / {len(resultats)} verdicts valides "
+          f"en {time.perf_counter() - start:.2f} s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
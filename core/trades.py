@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""Données de la machine à échanges, partagées par les pages et le préchauffage.
+
+Les salaires sont lus dans la table ``contracts``, analysée une fois à
+l'ingestion (data_processing/contracts.py) : une matrice int64 joueurs x
+saisons, le masque des cases vides ("None", "-", "—") et le nombre d'années
+de contrat. Aucune page ne nettoie plus de chaînes : un total de salaires est
+une simple lecture indexée dans la matrice.
+
+La jointure contrats x statistiques est construite une fois par version des
+données et partagée par toutes les sessions ; sa colonne ``ROW`` est la ligne
+du joueur dans la matrice.
+
+    contrats = trades.contrats(data.version())
+    pool = trades.pool_equipe(data.version(), teams.key("BOS"))
+    trades.salaire_cumule(data.version(), pool, "2025-26", ["Jayson Tatum"])
+
+``trouver_echanges`` cherche dans les 29 autres effectifs les combinaisons de
+joueurs dont le salaire cumulé respecte la règle des salaires (core.rules)
+face aux joueurs cédés, classées par statistiques (voir sa docstring).
+"""
+
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import data, rules
+from data_processing import contracts
+
+ANNEES = contracts.SEASONS
+
+# Statistiques de classement des échanges trouvés (cumulées sur les joueurs reçus)
+STATS_ECHANGE = ["PTS_PG", "REB_PG", "AST_PG", "PLUS_MINUS"]
+MAX_JOUEURS = 4
+WORKERS = 8
+
+
+@dataclass(frozen=True)
+class Contrats:
+    players: np.ndarray         # PLAYER, une ligne par contrat
+    team: np.ndarray            # TEAM_KEY (int8, 0 si équipe inconnue)
+    salaries: np.ndarray        # int64 (contrats x saisons), 0 hors contrat
+    placeholder: np.ndarray     # bool (contrats x saisons), case vide dans la source
+    contract_years: np.ndarray  # int8
+    guaranteed: np.ndarray      # int64
+
+    def saison(self, saison: str) -> int:
+        """Colonne de ``saison`` dans la matrice."""
+        return ANNEES.index(saison)
+
+    def totaux(self, rows: np.ndarray) -> np.ndarray:
+        """Salaire cumulé des lignes ``rows`` pour chaque saison (int64, une valeur par saison)."""
+        return self.salaries[rows].sum(axis=0)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def contrats(version: str) -> Contrats:
+    """Matrice des salaires de la version ``version`` (une fois par version des données)."""
+    return construire_contrats(data.table("contracts", version))
+
+
+def construire_contrats(df: pd.DataFrame) -> Contrats:
+    """Matrice des salaires d'une table ``contracts`` (sans cache, utilisable hors Streamlit)."""
+    return Contrats(
+        players=df["PLAYER"].to_numpy(object),
+        team=df["TEAM_KEY"].astype("Int8").fillna(0).to_numpy("int8"),
+        salaries=np.ascontiguousarray(df[ANNEES].to_numpy("int64")),
+        placeholder=df[contracts.PLACEHOLDER_COLUMNS].to_numpy(bool),
+        contract_years=df["CONTRACT_YEARS"].to_numpy("int8"),
+        guaranteed=df["GUARANTEED"].to_numpy("int64"),
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def jointures(version: str) -> pd.DataFrame:
+    """Salaires (en entiers) + statistiques de saison régulière, une ligne par contrat."""
+    df_joueurs_reg = data.table("reg_season_players_filtered", version)
+    df_contrats    = data.table("contracts", version)
+
+    # Étape 1: Contrats déjà typés à l'ingestion (salaires int64, années de contrat)
+    df_contrats = (
+        df_contrats[contracts.ID_COLUMNS + ANNEES + ["GUARANTEED", "CONTRACT_YEARS"]]
+          .rename(columns={"CONTRACT_YEARS": "contract_years"})
+          .assign(ROW=np.arange(len(df_contrats)))
+    )
+
+    # Étape 2: Créer un sous-ensemble propre de df_joueurs_reg avec seulement les colonnes pertinentes
+    # Renommer PLAYER_NAME -> PLAYER pour s'aligner avec les contrats
+    stat_cols = ["POSITION","AST_PG","BLK_PG","AGE","FG_PCT","FG3_PCT",
+                 "GP","MIN","PLUS_MINUS","PTS_PG","REB_PG","STL_PG","TOV_PG"]
+
+    df_reg_subset = (
+        df_joueurs_reg
+          .rename(columns={"PLAYER_NAME": "PLAYER"})
+          [["PLAYER","TEAM_KEY"] + stat_cols]
+    )
+
+    # Étape 3: Fusionner les contrats et les statistiques des joueurs dans un seul dataframe
+    return df_contrats.merge(df_reg_subset, on=["PLAYER","TEAM_KEY"], how="left")
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def pool_equipe(version: str, equipe: int) -> pd.DataFrame:
+    """Contrats d'une équipe (sous-ensemble de la jointure)."""
+    df_jointures = jointures(version)
+    return df_jointures[df_jointures["TEAM_KEY"] == equipe].reset_index(drop=True)
+
+
+def lignes(pool_df: pd.DataFrame, joueurs: list[str]) -> np.ndarray:
+    """Lignes de la matrice des salaires pour les joueurs sélectionnés dans ``pool_df``."""
+    return np.unique(pool_df.loc[pool_df["PLAYER"].isin(joueurs), "ROW"].to_numpy())
+
+
+def salaire_cumule(version: str, pool_df: pd.DataFrame, saison: str, joueurs_selectionnes: list[str]) -> int:
+    """Retourne le salaire cumulé des joueurs sélectionnés (lecture indexée dans la matrice)."""
+    if not joueurs_selectionnes or pool_df is None or saison not in ANNEES:
+        return 0
+    matrice = contrats(version)
+    return int(matrice.salaries[lignes(pool_df, joueurs_selectionnes), matrice.saison(saison)].sum())
+
+
+@dataclass(frozen=True)
+class Validation:
+    """Règles des échanges (core.rules) évaluées pour toutes les saisons de contrat (un tableau par saison de ANNEES)."""
+    total_a: np.ndarray   # int64, salaire cumulé cédé par A
+    total_b: np.ndarray   # int64, salaire cumulé cédé par B
+    ecart: np.ndarray     # |A - B| / max(A, B) (100% si un seul côté est payé), NaN si aucun
+    valide: np.ndarray    # bool
+    motifs: list[list[str]]  # par saison, raisons d'un refus
+
+    @property
+    def sous_contrat(self) -> np.ndarray:
+        """Saisons où au moins un côté cède un salaire (sinon la règle ne s'applique pas)."""
+        return (self.total_a > 0) | (self.total_b > 0)
+
+
+def valider_saisons(matrice: Contrats, equipe_a: int, rows_a: np.ndarray, equipe_b: int, rows_b: np.ndarray,
+                    regles: rules.Regles = rules.REGLES) -> Validation:
+    """Totaux, écarts et verdicts des deux côtés sur toutes les saisons en une passe sur la matrice."""
+    verdicts = rules.evaluer(
+        matrice.salaries, matrice.team,
+        echange=np.zeros(len(rows_a) + len(rows_b), np.int64),
+        rows=np.concatenate([rows_a, rows_b]),
+        destinations=np.array([equipe_b] * len(rows_a) + [equipe_a] * len(rows_b)),
+        nb_echanges=1, regles=regles,
+    )
+    valide = verdicts.valide[0] & verdicts.implique[0, [equipe_a, equipe_b]].all()
+    return Validation(verdicts.sortant[0, equipe_a], verdicts.sortant[0, equipe_b], verdicts.ecart[0, equipe_a],
+                      valide, [verdicts.motifs(0, j) for j in range(len(ANNEES))])
+
+
+# -------------------------------
+# Échanges à plusieurs équipes
+# -------------------------------
+@dataclass(frozen=True)
+class Bilan:
+    """Salaires sortants / entrants de chaque équipe d'un échange, pour toutes les saisons."""
+    equipes: np.ndarray   # TEAM_KEY des équipes de l'échange
+    sortant: np.ndarray   # int64 (équipes x saisons), salaires cédés
+    entrant: np.ndarray   # int64 (équipes x saisons), salaires reçus
+    ecart: np.ndarray     # |entrant - sortant| / max, NaN si l'équipe ne cède ni ne reçoit rien
+    valide: np.ndarray    # bool (équipes x saisons), True si les règles ne s'appliquent pas
+    motifs: list[list[str]]  # par saison, raisons d'un refus
+
+    @property
+    def echange_valide(self) -> np.ndarray:
+        """Verdict de l'échange par saison : toutes les équipes respectent les règles."""
+        return self.valide.all(axis=0)
+
+
+def bilan_equipes(matrice: Contrats, equipes: list[int], rows: np.ndarray, destinations: np.ndarray,
+                  regles: rules.Regles = rules.REGLES) -> Bilan:
+    """Bilan de toutes les équipes en un seul calcul (core.rules.evaluer sur un lot d'un échange).
+
+    ``rows`` sont les lignes de la matrice des joueurs échangés (leur équipe
+    d'origine est celle du contrat) et ``destinations`` le TEAM_KEY de l'équipe
+    qui reçoit chacun d'eux.
+    """
+    equipes = np.asarray(equipes, dtype=np.int64)
+    verdicts = rules.evaluer(matrice.salaries, matrice.team, np.zeros(len(rows), np.int64), rows, destinations,
+                             nb_echanges=1, regles=regles)
+    ok = (verdicts.ok_salaires[0] & verdicts.ok_effectif[0]) | ~verdicts.implique[0][:, None]
+    return Bilan(equipes, verdicts.sortant[0, equipes], verdicts.entrant[0, equipes], verdicts.ecart[0, equipes],
+                 ok[equipes], [verdicts.motifs(0, j) for j in range(len(ANNEES))])
+
+
+# -------------------------------
+# Recherche d'échanges dans toute la ligue
+# -------------------------------
+@dataclass(frozen=True)
+class Effectif:
+    rows: np.ndarray      # lignes de la matrice, triées par salaire croissant
+    salaries: np.ndarray  # int64, salaires > 0 de la saison (même ordre)
+    stats: np.ndarray     # float64 (joueurs x STATS_ECHANGE), 0 si pas de statistiques
+
+
+@st.cache_resource(show_spinner=False, max_entries=24)
+def effectifs(version: str, saison: str) -> dict[int, Effectif]:
+    """Par équipe, les joueurs sous contrat pour ``saison`` triés par salaire (une fois par version et saison)."""
+    matrice = contrats(version)
+    df_jointures = jointures(version)
+    stats = np.zeros((len(matrice.players), len(STATS_ECHANGE)))
+    stats[df_jointures["ROW"].to_numpy()] = df_jointures[STATS_ECHANGE].fillna(0).to_numpy(float)
+
+    salaires = matrice.salaries[:, matrice.saison(saison)]
+    resultat = {}
+    for equipe in np.unique(matrice.team[matrice.team > 0]):
+        rows = np.flatnonzero((matrice.team == equipe) & (salaires > 0))
+        rows = rows[np.argsort(salaires[rows], kind="stable")]
+        resultat[int(equipe)] = Effectif(rows, salaires[rows], stats[rows])
+    return resultat
+
+
+def _sous_ensembles(salaires: np.ndarray, stats: np.ndarray, max_joueurs: int):
+    """Combinaisons d'au plus ``max_joueurs`` joueurs d'une moitié d'effectif (vide comprise) :
+    masque, taille, salaire et stats cumulés."""
+    masques, tailles, sommes, cumuls = [], [], [], []
+    for r in range(min(max_joueurs, len(salaires)) + 1):
+        idx = np.array(list(itertools.combinations(range(len(salaires)), r)),
+                       dtype=np.int64).reshape(math.comb(len(salaires), r), r)
+        masques.append((np.int64(1) << idx).sum(axis=1))
+        tailles.append(np.full(len(idx), r))
+        sommes.append(salaires[idx].sum(axis=1))
+        cumuls.append(stats[idx].sum(axis=1))
+    return tuple(np.concatenate(parts) for parts in (masques, tailles, sommes, cumuls))
+
+
+def _chercher_equipe(effectif: Effectif, bas: int, haut: int, max_joueurs: int):
+    """Combinaisons de ``effectif`` dont le salaire cumulé est dans [bas, haut] (meet-in-the-middle).
+
+    Les joueurs plus chers que ``haut`` sont écartés d'emblée (salaires triés). Le
+    reste est coupé en deux moitiés, dont seules les combinaisons d'au plus
+    ``max_joueurs`` joueurs sont énumérées : chaque combinaison de gauche cherche par
+    dichotomie, dans les sommes triées de droite (une liste par nombre de
+    joueurs), l'intervalle des compléments [bas - g, haut - g].
+    Retourne (masques, salaires, stats) des combinaisons trouvées.
+    """
+    n = int(np.searchsorted(effectif.salaries, haut, side="right"))
+    salaires, stats = effectif.salaries[:n], effectif.stats[:n]
+    moitie = n // 2
+    mg, cg, sg, stg = _sous_ensembles(salaires[:moitie], stats[:moitie], max_joueurs)
+    md, cd, sd, std = _sous_ensembles(salaires[moitie:], stats[moitie:], max_joueurs)
+
+    trouves = []
+    for nb_droite in range(max_joueurs + 1):
+        choix = np.flatnonzero(cd == nb_droite)
+        choix = choix[np.argsort(sd[choix], kind="stable")]
+        sommes = sd[choix]
+        gauche = np.flatnonzero((cg <= max_joueurs - nb_droite) & (sg <= haut))
+        debut = np.searchsorted(sommes, bas - sg[gauche], side="left")
+        fin = np.searchsorted(sommes, haut - sg[gauche], side="right")
+        nb = fin - debut
+        if not nb.any():
+            continue
+        g = np.repeat(gauche, nb)
+        d = choix[np.repeat(debut, nb) + np.arange(nb.sum()) - np.repeat(np.cumsum(nb) - nb, nb)]
+        trouves.append((mg[g] | (md[d] << moitie), sg[g] + sd[d], stg[g] + std[d]))
+    if not trouves:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty((0, len(STATS_ECHANGE)))
+    return tuple(np.concatenate(parts) for parts in zip(*trouves))
+
+
+def trouver_echanges(version: str, equipe: int, saison: str, joueurs: list[str], critere: str = "PTS_PG",
+                     max_joueurs: int = 3, regles: rules.Regles = rules.REGLES, n: int = 25) -> pd.DataFrame:
+    """Meilleurs échanges possibles dans la ligue contre les ``joueurs`` cédés par ``equipe``.
+
+    Pour chacune des 29 autres équipes (en parallèle), énumère les combinaisons
+    d'au plus ``max_joueurs`` joueurs dont le salaire cumulé pour ``saison``
+    respecte la règle des salaires de ``regles`` face aux joueurs cédés, pour
+    les deux équipes (le palier dépend du salaire cédé), puis garde les
+    ``n`` meilleures selon ``critere`` (stat de STATS_ECHANGE cumulée sur les
+    joueurs reçus ; à égalité, le plus petit écart de salaire).
+    Colonnes : TEAM_KEY, PLAYERS (liste), SALARY, DIFF_PCT + STATS_ECHANGE.
+    """
+    colonnes = ["TEAM_KEY", "PLAYERS", "SALARY", "DIFF_PCT"] + STATS_ECHANGE
+    matrice = contrats(version)
+    total = salaire_cumule(version, pool_equipe(version, equipe), saison, joueurs)
+    autres = {cle: eff for cle, eff in effectifs(version, saison).items() if cle != equipe}
+    if total <= 0 or not autres:
+        return pd.DataFrame(columns=colonnes)
+    bas, haut = rules.bande(total, regles)
+    max_joueurs = min(max_joueurs, MAX_JOUEURS)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        resultats = dict(zip(autres, pool.map(lambda eff: _chercher_equipe(eff, bas, haut, max_joueurs),
+                                              autres.values())))
+
+    cles = np.concatenate([np.full(len(r[0]), cle) for cle, r in resultats.items()])
+    masques, salaires, stats = (np.concatenate(parts) for parts in zip(*resultats.values()))
+    # L'autre équipe cède ``salaires`` et reçoit ``total`` : sa propre règle doit aussi passer
+    garde = rules.conforme(salaires, total, regles) & (masques != 0)
+    cles, masques, salaires, stats = cles[garde], masques[garde], salaires[garde], stats[garde]
+    ecarts = np.abs(salaires - total) / np.maximum(salaires, total)
+    meilleurs = np.lexsort((ecarts, -stats[:, STATS_ECHANGE.index(critere)]))[:n]
+
+    lignes_joueurs = []
+    for cle, masque in zip(cles[meilleurs], masques[meilleurs]):
+        rows = autres[cle].rows
+        lignes_joueurs.append([matrice.players[rows[i]] for i in range(len(rows)) if masque >> i & 1])
+    return pd.DataFrame({
+        "TEAM_KEY": cles[meilleurs].astype(int),
+        "PLAYERS": lignes_joueurs,
+        "SALARY": salaires[meilleurs],
+        "DIFF_PCT": ecarts[meilleurs],
+        **{stat: stats[meilleurs, i] for i, stat in enumerate(STATS_ECHANGE)},
+    }, columns=colonnes)
+
+
+def _warm(version: str) -> None:
+    contrats(version)
+    for saison in ANNEES:
+        effectifs(version, saison)
+    df_jointures = jointures(version)
+    for equipe in df_jointures["TEAM_KEY"].dropna().unique():
+        pool_equipe(version, equipe)
+
+
+data.on_new_version(_warm)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Préchauffage des caches en arrière-plan au démarrage du serveur.
+
+Streamlit n'exécute le code des pages qu'à la première session : la première
+page ouverte appelle ``start()``, qui lance (une fois par processus) un thread
+chargeant toute la génération servie — chaque table, la connexion DuckDB, les
+index de classements, la jointure et les effectifs de la machine à échanges.
+Les visiteurs suivants, sur n'importe quelle page, trouvent des caches chauds.
+
+``status()`` donne l'avancement ; ``show_status()`` l'affiche discrètement
+dans une page tant que le préchauffage n'est pas terminé.
+
+    from core import warmup
+    warmup.show_status()
+"""
+
+import atexit
+import threading
+import time
+from dataclasses import dataclass
+
+import streamlit as st
+
+# Importés pour enregistrer leurs préchargements (data.on_new_version)
+from core import data, leaderboards, trades  # noqa: F401
+
+# À l'arrêt du processus, le préchauffage est abandonné : il s'arrête à la fin de
+# l'étape en cours, attendue au plus STOP_TIMEOUT secondes (un thread encore dans
+# DuckDB / pyarrow pendant l'arrêt de l'interpréteur peut le faire planter).
+STOP_TIMEOUT = 1.0
+
+
+@dataclass
+class Status:
+    state: str = "en attente"  # en attente / en cours / prêt / interrompu / erreur
+    generation: str | None = None
+    step: str = ""
+    done: int = 0
+    total: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "prêt"
+
+
+_status = Status()
+_stop = threading.Event()
+
+
+def _run() -> None:
+    start = time.perf_counter()
+    try:
+        generation = data.version()
+        steps = data.load_steps(generation)
+        _status.generation, _status.total, _status.state = generation, len(steps), "en cours"
+        for label, step in steps:
+            if _stop.is_set():
+                _status.state = "interrompu"
+                return
+            _status.step = label
+            step()
+            _status.done += 1
+        _status.state = "prêt"
+    except Exception as e:  # les pages se chargeront à la demande, comme sans préchauffage
+        _status.state, _status.error = "erreur", str(e)
+        print(f"[warmup] préchauffage interrompu : {e}")
+    finally:
+        _status.step = ""
+        _status.seconds = round(time.perf_counter() - start, 3)
+
+
+@st.cache_resource(show_spinner=False)
+def start() -> threading.Thread:
+    """Lance le préchauffage (une seule fois par processus serveur)."""
+    thread = threading.Thread(target=_run, name="cache-warmup", daemon=True)
+    thread.start()
+    atexit.register(_abandon, thread)
+    return thread
+
+
+def _abandon(thread: threading.Thread) -> None:
+    _stop.set()
+    thread.join(STOP_TIMEOUT)
+
+
+def status() -> Status:
+    return _status
+
+
+def show_status() -> None:
+    """Démarre le préchauffage si besoin et signale qu'il est en cours."""
+    start()
+    if _status.state in ("en attente", "en cours"):
+        st.caption(f"Préchargement des données en arrière-plan… {_status.done}/{_status.total or '?'}")
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Offline data pipeline (nba_api + Excel sources -> data/)."""
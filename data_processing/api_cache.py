@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Record/replay disk cache in front of every nba_api endpoint call.
+
+Responses are stored as the raw JSON text returned by stats.nba.com, keyed on
+the endpoint name plus its normalized request parameters (as nba_api would
+send them, defaults included), so a cached call rebuilds exactly the same
+DataFrames as a live one.
+
+Modes (``NBA_API_MODE`` env var, or ``set_mode`` / pipeline ``--api-mode``):
+
+    live    serve from data/.api_cache/ while younger than the endpoint TTL,
+            otherwise call the API and refresh the cache (default)
+    record  always call the API, and also save the response as a fixture
+    replay  serve only recorded fixtures; never touch the network
+
+Fixtures live in data_processing/fixtures/ (``NBA_API_FIXTURES`` to override),
+so a rebuild in replay mode is offline and deterministic, e.g. in CI:
+
+    NBA_API_MODE=record python -m data_processing.pipeline --force   # once, online
+    NBA_API_MODE=replay python -m data_processing.pipeline --force   # offline
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from nba_api.stats.library.http import NBAStatsResponse
+
+from data_processing import nba_client
+
+# -------------------------------
+# Config
+# -------------------------------
+CACHE_DIR = "data/.api_cache"
+FIXTURE_DIR = os.environ.get("NBA_API_FIXTURES", "data_processing/fixtures")
+MODES = ("live", "record", "replay")
+
+HOUR = 3600
+DEFAULT_TTL = 1 * HOUR
+TTL = {
+    "leaguedashplayerstats": 6 * HOUR,
+    "playerindex": 24 * HOUR,
+}
+
+_mode = os.environ.get("NBA_API_MODE", "live")
+
+
+class ReplayMissError(nba_client.PermanentError, LookupError):
+    """Replay mode was asked for a response that was never recorded."""
+
+
+def set_mode(mode: str) -> None:
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown NBA API mode {mode!r} (expected one of {', '.join(MODES)})")
+    _mode = mode
+
+
+def get_mode() -> str:
+    return _mode
+
+
+# -------------------------------
+# Keys
+# -------------------------------
+def normalize_params(parameters: dict) -> dict:
+    """Stable, JSON-friendly request parameters: sorted keys, strings, no None."""
+    return {
+        str(k): str(v).strip()
+        for k, v in sorted(parameters.items())
+        if v is not None and str(v).strip() != ""
+    }
+
+
+def cache_key(endpoint_name: str, parameters: dict) -> str:
+    payload = json.dumps([endpoint_name.lower(), normalize_params(parameters)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def entry_path(root: str, endpoint_name: str, parameters: dict) -> str:
+    return os.path.join(root, endpoint_name.lower(), f"{cache_key(endpoint_name, parameters)}.json")
+
+
+def read_entry(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_entry(path: str, endpoint_name: str, parameters: dict, response: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {
+        "endpoint": endpoint_name,
+        "params": normalize_params(parameters),
+        "fetched_at": time.time(),
+        "response": response,
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+# -------------------------------
+# Calls
+# -------------------------------
+def _load(endpoint, response: str):
+    endpoint.nba_response = NBAStatsResponse(response=response, status_code=200, url=None)
+    endpoint.load_response()
+    return endpoint
+
+
+def call(endpoint_cls, **kwargs):
+    """Instantiate an nba_api endpoint, serving its response from cache/fixtures when possible.
+
+    Returns the loaded endpoint object, so callers keep using ``get_data_frames()``.
+    """
+    endpoint = endpoint_cls(**kwargs, get_request=False)
+    name, params = endpoint.endpoint, endpoint.parameters
+
+    if _mode == "replay":
+        entry = read_entry(entry_path(FIXTURE_DIR, name, params))
+        if entry is None:
+            raise ReplayMissError(f"No recorded response for {name} {normalize_params(params)}")
+        return _load(endpoint, entry["response"])
+
+    cache_path = entry_path(CACHE_DIR, name, params)
+    if _mode == "live":
+        entry = read_entry(cache_path)
+        if entry is not None and time.time() - entry["fetched_at"] < TTL.get(name.lower(), DEFAULT_TTL):
+            return _load(endpoint, entry["response"])
+
+    nba_client.send(endpoint)
+    response = endpoint.nba_response.get_response()
+    write_entry(cache_path, name, params, response)
+    if _mode == "record":
+        write_entry(entry_path(FIXTURE_DIR, name, params), name, params, response)
+    return endpoint
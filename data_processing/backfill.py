@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Resumable multi-season backfill of LeagueDashPlayerStats (1996-97 onward).
+
+Every (season, season type) pair is one task; tasks run in parallel through
+nba_client (shared rate limiter + retries) and api_cache. Each finished task
+is written as its own partition of a Hive-partitioned Parquet dataset and
+recorded in a checkpoint file, so a crash or Ctrl-C resumes where it stopped:
+
+    data/players_history/
+        _checkpoint.json
+        SEASON=1996-97/SEASON_TYPE=Regular%20Season/part-0.parquet
+        SEASON=1996-97/SEASON_TYPE=Playoffs/part-0.parquet
+        ...
+
+Run from the repository root:
+
+    python -m data_processing.backfill                       # 1996-97 -> current season
+    python -m data_processing.backfill --start 2015-16 --workers 4
+    python -m data_processing.backfill --redo                # ignore the checkpoint
+
+Readers load only the partitions they need with ``load_history``.
+"""
+
+import argparse
+import json
+import os
+import time
+from urllib.parse import quote
+
+import pandas as pd
+
+from data_processing import api_cache, processing
+from data_processing.nba_client import fetch_many
+
+# -------------------------------
+# Config
+# -------------------------------
+HISTORY_DIR = "data/players_history"
+CHECKPOINT_PATH = os.path.join(HISTORY_DIR, "_checkpoint.json")
+FIRST_SEASON = "1996-97"
+SEASON_TYPES = ("Regular Season", "Playoffs")
+
+
+def season_label(start_year: int) -> str:
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def season_range(start: str = FIRST_SEASON, end: str = processing.SEASON) -> list[str]:
+    return [season_label(y) for y in range(int(start[:4]), int(end[:4]) + 1)]
+
+
+def partition_path(season: str, season_type: str) -> str:
+    return os.path.join(HISTORY_DIR, f"SEASON={season}",
+                        f"SEASON_TYPE={quote(season_type)}", "part-0.parquet")
+
+
+# -------------------------------
+# Checkpoint
+# -------------------------------
+def load_checkpoint() -> dict:
+    if not os.path.exists(CHECKPOINT_PATH):
+        return {}
+    with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(done: dict) -> None:
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    tmp = CHECKPOINT_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(done, f, indent=2, sort_keys=True)
+    os.replace(tmp, CHECKPOINT_PATH)
+
+
+def task_key(season: str, season_type: str) -> str:
+    return f"{season}|{season_type}"
+
+
+def write_partition(df: pd.DataFrame, season: str, season_type: str) -> None:
+    """Atomically (re)write one partition; the checkpoint is only updated afterwards."""
+    path = partition_path(season, season_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # "_" prefix: pyarrow skips the file if a crash leaves it behind (like _checkpoint.json)
+    tmp = os.path.join(os.path.dirname(path), "_" + os.path.basename(path) + ".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+# -------------------------------
+# Backfill
+# -------------------------------
+def backfill(seasons: list[str], season_types=SEASON_TYPES, workers: int = 4, redo: bool = False) -> dict:
+    """Fetch every missing (season, season type) partition. Returns the checkpoint."""
+    done = {} if redo else load_checkpoint()
+    todo = {
+        task_key(season, st): (season, st)
+        for season in seasons for st in season_types
+        if redo or task_key(season, st) not in done
+    }
+    print(f"Backfill: {len(todo)} partition(s) to fetch, {len(done)} already done.")
+
+    def task(season, st):
+        return lambda: processing.fetch_player_stats(season, st)
+
+    def on_done(i, total, result):
+        season, st = todo[result.key]
+        if not result.ok:
+            print(f"[{i}/{total}] {season} {st}: FAILED ({result.error})")
+            return
+        write_partition(result.value, season, st)
+        done[result.key] = {"rows": len(result.value), "finished_at": time.time()}
+        save_checkpoint(done)
+        print(f"[{i}/{total}] {season} {st}: {len(result.value)} rows")
+
+    # fetch_player_stats already retries with backoff
+    fetch_many({key: task(*args) for key, args in todo.items()},
+               workers=workers, retries=1, on_progress=on_done)
+
+    missing = [k for k in todo if k not in done]
+    if missing:
+        print(f"{len(missing)} partition(s) failed; rerun to resume: {', '.join(missing)}")
+    return done
+
+
+def load_history(seasons: list[str] | None = None, season_types: list[str] | None = None,
+                 columns: list[str] | None = None) -> pd.DataFrame:
+    """Read the backfilled dataset, touching only the requested partitions."""
+    filters = []
+    if seasons:
+        filters.append(("SEASON", "in", list(seasons)))
+    if season_types:
+        filters.append(("SEASON_TYPE", "in", list(season_types)))
+    return pd.read_parquet(HISTORY_DIR, columns=columns, filters=filters or None,
+                           partitioning="hive")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Backfill player stats for every season since 1996-97.")
+    parser.add_argument("--start", default=FIRST_SEASON)
+    parser.add_argument("--end", default=processing.SEASON)
+    parser.add_argument("--season-types", nargs="*", default=list(SEASON_TYPES))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--redo", action="store_true", help="refetch partitions already checkpointed")
+    parser.add_argument("--api-mode", choices=api_cache.MODES, default=api_cache.get_mode())
+    args = parser.parse_args(argv)
+    api_cache.set_mode(args.api_mode)
+
+    start = time.perf_counter()
+    backfill(season_range(args.start, args.end), args.season_types, args.workers, args.redo)
+    print(f"Done in {time.perf_counter() - start:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Typed contracts table, parsed once from the salary sheet at ingest.
+
+The salary sheet stores amounts as display strings ("$59,606,817") and empty
+seasons as placeholders ("None", "-", "—", blank). ``parse`` turns it into the
+``contracts`` table of the dataset, one row per contract (same order as
+``nba_players_salaries``):
+
+    TEAM_KEY, PLAYER, TEAM, TM
+    2025-26 ... 2030-31        int64 salary per season (0 when not under contract)
+    GUARANTEED                 int64
+    PLACEHOLDER_2025-26 ...    bool, True where the sheet had a placeholder
+    CONTRACT_YEARS             int8, seasons actually under contract
+
+so readers gather a dense players x seasons int64 matrix with ``to_numpy``
+instead of cleaning strings:
+
+    df = dataset.read("contracts")
+    salaries = df[contracts.SEASONS].to_numpy()                  # (players, seasons)
+    placeholder = df[contracts.PLACEHOLDER_COLUMNS].to_numpy()
+"""
+
+import pandas as pd
+
+SEASONS = ["2025-26", "2026-27", "2027-28", "2028-29", "2029-30", "2030-31"]
+PLACEHOLDERS = ("None", "-", "—", "")
+PLACEHOLDER_COLUMNS = [f"PLACEHOLDER_{s}" for s in SEASONS]
+ID_COLUMNS = ["TEAM_KEY", "PLAYER", "TEAM", "TM"]
+
+
+def placeholder(values: pd.Series) -> pd.Series:
+    """True where a salary cell is empty or one of the sheet's placeholders."""
+    return values.isna() | values.astype(str).str.strip().isin(PLACEHOLDERS)
+
+
+def amount(values: pd.Series) -> pd.Series:
+    """Salary strings ("$59,606,817") to int64 dollars; anything without digits is 0."""
+    digits = values.astype(str).str.replace(r"[^0-9]", "", regex=True)
+    return pd.to_numeric(digits, errors="coerce").fillna(0).astype("int64")
+
+
+def parse(df_salaries: pd.DataFrame) -> pd.DataFrame:
+    """The ``contracts`` table from the cleaned salary sheet (see module docstring)."""
+    out = df_salaries[ID_COLUMNS].reset_index(drop=True)
+    empty = {}
+    for season, flag in zip(SEASONS, PLACEHOLDER_COLUMNS):
+        values = df_salaries[season].reset_index(drop=True) if season in df_salaries else pd.Series([None] * len(out))
+        empty[flag] = placeholder(values)
+        out[season] = amount(values).where(~empty[flag], 0)
+    out["GUARANTEED"] = amount(df_salaries["GUARANTEED"].reset_index(drop=True))
+    for flag, values in empty.items():
+        out[flag] = values.to_numpy(bool)
+    out["CONTRACT_YEARS"] = (~pd.DataFrame(empty)).sum(axis=1).astype("int8")
+    return out
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Typed columnar dataset (Parquet) written by the pipeline and read by the pages.
+
+One file per table in each published generation (see generations.py), named
+like the old Excel exports:
+
+    data/generations/<id>/df_reg_season_players_filtered.parquet
+    data/generations/<id>/df_nba_players_salaries.parquet
+    ...
+
+Parquet keeps the column dtypes, so readers get numbers as numbers without
+any parsing. Team key columns are stored as small ints (Parquet has no
+integer dictionary type pandas reads back as categorical) and turned back
+into the categorical TEAM_KEY dtype on read.
+"""
+
+import os
+
+import pandas as pd
+
+from data_processing import generations, teams
+
+
+def path(name: str, directory: str | None = None) -> str:
+    """File of table ``name`` in ``directory`` (default: the current generation)."""
+    return os.path.join(directory or generations.current_dir(), f"df_{name}.parquet")
+
+
+def write(name: str, df: pd.DataFrame, directory: str) -> str:
+    """Write one table into a (staging) generation directory; returns its path."""
+    out = df.copy(deep=False)
+    for col in teams.KEY_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("Int8")
+    filename = path(name, directory)
+    out.to_parquet(filename, index=False)
+    return filename
+
+
+def read(name: str, columns: list[str] | None = None, directory: str | None = None) -> pd.DataFrame:
+    """One table with its categorical team keys restored."""
+    return teams.categorize(pd.read_parquet(path(name, directory), columns=columns))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Vectorized stat-derivation engine.
+
+Derived columns are declared, not coded: a list of counting stats, a list of
+rate types (each a denominator built as a linear combination of box-score
+columns, times a scale) and a list of ratios (shooting percentages, as
+numerator/denominator linear combinations). ``derive`` computes all of them
+in one NumPy pass over a 2-D float block:
+
+    denominators = X @ W                       (n x rates)
+    rates        = X[:, stat] * scale / denominators[:, rate]
+    ratios       = (X @ A) / (X @ B)
+
+with zero denominators yielding 0.0. Adding a rate type or a ratio is one
+line in RATES / RATIOS, never new code per column. The same call works on a
+single season or on the concatenated multi-season backfill.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Declarations
+# -------------------------------
+COUNTING_STATS = ['MIN', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA', 'PTS',
+                  'OREB', 'DREB', 'REB', 'AST', 'TOV', 'STL', 'BLK', 'PLUS_MINUS']
+
+
+@dataclass(frozen=True)
+class Rate:
+    """STAT / (denominator) * scale for every counting stat, written as STAT + suffix."""
+    suffix: str
+    denominator: dict[str, float]
+    scale: float = 1.0
+    exclude: tuple[str, ...] = ()
+    decimals: int = 1
+
+
+@dataclass(frozen=True)
+class Ratio:
+    """name = (numerator) / (denominator), both linear combinations of columns."""
+    name: str
+    numerator: dict[str, float]
+    denominator: dict[str, float]
+    decimals: int = 3
+
+
+# Player possessions estimate: FGA + 0.44 * FTA - OREB + TOV
+POSSESSIONS = {'FGA': 1.0, 'FTA': 0.44, 'OREB': -1.0, 'TOV': 1.0}
+
+RATES = [
+    Rate('_PG', {'GP': 1.0}),
+    Rate('_P36', {'MIN': 1.0}, scale=36.0, exclude=('MIN',)),
+    Rate('_P100', POSSESSIONS, scale=100.0, exclude=('MIN',)),
+]
+
+RATIOS = [
+    Ratio('FG_PCT', {'FGM': 1.0}, {'FGA': 1.0}),
+    Ratio('FG3_PCT', {'FG3M': 1.0}, {'FG3A': 1.0}),
+    Ratio('FT_PCT', {'FTM': 1.0}, {'FTA': 1.0}),
+    Ratio('EFG_PCT', {'FGM': 1.0, 'FG3M': 0.5}, {'FGA': 1.0}),
+    Ratio('TS_PCT', {'PTS': 0.5}, {'FGA': 1.0, 'FTA': 0.44}),
+]
+
+
+# -------------------------------
+# Engine
+# -------------------------------
+def _weights(columns: list[str], combos: list[dict[str, float]]) -> np.ndarray:
+    """(len(columns) x len(combos)) matrix so that X @ W evaluates every combination."""
+    pos = {c: i for i, c in enumerate(columns)}
+    w = np.zeros((len(columns), len(combos)))
+    for j, combo in enumerate(combos):
+        for col, coef in combo.items():
+            w[pos[col], j] = coef
+    return w
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros(np.broadcast_shapes(num.shape, den.shape)), where=den != 0)
+
+
+def derive(df: pd.DataFrame, stats=COUNTING_STATS, rates=RATES, ratios=RATIOS) -> pd.DataFrame:
+    """Return a copy of ``df`` with every rate and ratio column computed.
+
+    Existing columns with the same name keep their position, new ones are
+    appended in declaration order (all STAT_PG, then STAT_P36, ..., then ratios).
+    """
+    stats = list(stats)
+    base = list(dict.fromkeys(
+        stats
+        + [c for r in rates for c in r.denominator]
+        + [c for q in ratios for c in (*q.numerator, *q.denominator)]
+    ))
+    x = df[base].to_numpy(dtype=np.float64)
+
+    # One output column per (stat, rate) pair, then one per ratio
+    pairs = [(i, j) for j, r in enumerate(rates) for i, s in enumerate(stats) if s not in r.exclude]
+    names = [stats[i] + rates[j].suffix for i, j in pairs] + [q.name for q in ratios]
+    decimals = [rates[j].decimals for _, j in pairs] + [q.decimals for q in ratios]
+    stat_idx, rate_idx = (np.array(a, dtype=np.intp) for a in zip(*pairs))
+    scales = np.array([r.scale for r in rates])
+
+    # Numerators and denominators side by side, divided in a single call
+    dens = x @ _weights(base, [r.denominator for r in rates])
+    num = np.hstack([x[:, stat_idx] * scales[rate_idx], x @ _weights(base, [q.numerator for q in ratios])])
+    den = np.hstack([dens[:, rate_idx], x @ _weights(base, [q.denominator for q in ratios])])
+    values = _safe_divide(num, den)
+
+    factor = 10.0 ** np.array(decimals)
+    np.multiply(values, factor, out=values)
+    np.rint(values, out=values)
+    np.divide(values, factor, out=values)
+
+    derived = pd.DataFrame(values, columns=names, index=df.index)
+    kept = df.drop(columns=[n for n in names if n in df.columns])
+    order = list(df.columns) + [n for n in names if n not in df.columns]
+    return pd.concat([kept, derived], axis=1)[order]
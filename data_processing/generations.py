@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""Atomic, versioned publication of the app's data (Parquet dataset + DuckDB store).
+
+Every pipeline publish writes a complete new generation into a private
+staging directory, fsyncs it, renames it into place and only then switches
+the ``data/current`` pointer (itself replaced atomically):
+
+    data/current                                    -> "20261018T041722Z-3f2a9c1e"
+    data/generations/20261018T041722Z-3f2a9c1e/
+        manifest.json                               files, row counts, sha256
+        df_reg_season_players_filtered.parquet
+        ...
+        nba.duckdb
+
+A generation is never modified once published, so a reader that resolved the
+pointer keeps a consistent dataset: it sees the old generation or the new one,
+never a half-written or mixed one. A table that did not change since the
+current generation is hard-linked from it (``link``) instead of rewritten, so
+its file and content hash stay the same. The last ``KEEP`` generations stay on
+disk, so a bad refresh is undone by moving the pointer back:
+
+    python -m data_processing.generations list
+    python -m data_processing.generations rollback            # previous generation
+    python -m data_processing.generations rollback 20261017T...
+    python -m data_processing.generations verify              # re-hash vs manifest
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Callable
+
+import duckdb
+import pyarrow.parquet as pq
+
+# -------------------------------
+# Config
+# -------------------------------
+DATA_DIR = "data"
+GENERATIONS_DIR = os.path.join(DATA_DIR, "generations")
+CURRENT_PATH = os.path.join(DATA_DIR, "current")
+MANIFEST = "manifest.json"
+STAGING_PREFIX = ".staging-"
+KEEP = 5
+
+
+class GenerationError(RuntimeError):
+    """No usable generation (never published, missing files or hash mismatch)."""
+
+
+# -------------------------------
+# Durability helpers
+# -------------------------------
+def _fsync_file(path: str) -> None:
+    with open(path, "r+b") as f:  # Windows only flushes handles opened for writing
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: str) -> None:
+    # Directory entries (renames) are only durable once the directory is synced;
+    # Windows cannot open a directory for that and persists renames on its own.
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# -------------------------------
+# Manifest
+# -------------------------------
+def _rows(path: str) -> int | dict[str, int] | None:
+    """Row count of a Parquet file, or of every table of a DuckDB file."""
+    if path.endswith(".parquet"):
+        return pq.read_metadata(path).num_rows
+    if path.endswith(".duckdb"):
+        con = duckdb.connect(path, read_only=True)
+        try:
+            names = [r[0] for r in con.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_type = 'BASE TABLE'"
+            ).fetchall()]
+            return {n: con.execute(f'SELECT COUNT(*) FROM "{n}"').fetchone()[0] for n in sorted(names)}
+        finally:
+            con.close()
+    return None
+
+
+def build_manifest(directory: str, meta: dict | None = None) -> dict:
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name == MANIFEST or not os.path.isfile(path):
+            continue
+        files[name] = {"bytes": os.path.getsize(path), "sha256": _sha256(path), "rows": _rows(path)}
+    content = hashlib.sha256(json.dumps(
+        {n: f["sha256"] for n, f in files.items()}, sort_keys=True
+    ).encode()).hexdigest()
+    return {"content_hash": content, "meta": meta or {}, "files": files}
+
+
+def read_manifest(generation: str) -> dict:
+    with open(os.path.join(path(generation), MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify(generation: str) -> list[str]:
+    """Problems found when re-hashing ``generation`` against its manifest (empty if sound)."""
+    try:
+        manifest = read_manifest(generation)
+    except (OSError, ValueError) as e:
+        return [f"manifest unreadable: {e}"]
+    problems = []
+    for name, entry in manifest["files"].items():
+        file_path = os.path.join(path(generation), name)
+        if not os.path.exists(file_path):
+            problems.append(f"{name}: missing")
+        elif _sha256(file_path) != entry["sha256"]:
+            problems.append(f"{name}: content hash mismatch")
+    return problems
+
+
+# -------------------------------
+# Pointer
+# -------------------------------
+def path(generation: str) -> str:
+    return os.path.join(GENERATIONS_DIR, generation)
+
+
+def current() -> str:
+    """Id of the published generation readers should use."""
+    try:
+        with open(CURRENT_PATH, encoding="utf-8") as f:
+            generation = f.read().strip()
+    except FileNotFoundError:
+        raise GenerationError(f"No data published yet ({CURRENT_PATH} missing): run the pipeline") from None
+    return generation
+
+
+def current_dir() -> str:
+    return path(current())
+
+
+def list_generations() -> list[str]:
+    """Published generations, oldest first (ids start with their UTC timestamp)."""
+    if not os.path.isdir(GENERATIONS_DIR):
+        return []
+    return sorted(
+        g for g in os.listdir(GENERATIONS_DIR)
+        if not g.startswith(STAGING_PREFIX) and os.path.exists(os.path.join(path(g), MANIFEST))
+    )
+
+
+def activate(generation: str, check: bool = True) -> None:
+    """Atomically point readers at ``generation``."""
+    if check:
+        problems = verify(generation)
+        if problems:
+            raise GenerationError(f"Generation {generation} is not usable: " + "; ".join(problems))
+    tmp = CURRENT_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(generation + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, CURRENT_PATH)
+    _fsync_dir(DATA_DIR)
+
+
+# -------------------------------
+# Publish / rollback
+# -------------------------------
+def publish(write: Callable[[str], None], meta: dict | None = None, keep: int = KEEP) -> str:
+    """Publish a new generation: ``write(directory)`` fills a staging directory,
+    which is then fsynced, given its manifest, renamed into place and activated."""
+    os.makedirs(GENERATIONS_DIR, exist_ok=True)
+    for leftover in os.listdir(GENERATIONS_DIR):
+        if leftover.startswith(STAGING_PREFIX):  # a publish that crashed midway
+            shutil.rmtree(os.path.join(GENERATIONS_DIR, leftover), ignore_errors=True)
+
+    staging = os.path.join(GENERATIONS_DIR, f"{STAGING_PREFIX}{os.getpid()}")
+    os.makedirs(staging)
+    try:
+        write(staging)
+        manifest = build_manifest(staging, {**(meta or {}), "published_at": time.time()})
+        generation = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + manifest["content_hash"][:8]
+        manifest["generation"] = generation
+        with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        for name in os.listdir(staging):
+            _fsync_file(os.path.join(staging, name))
+        _fsync_dir(staging)
+        if os.path.exists(path(generation)):  # same content published within the same second
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, path(generation))
+            _fsync_dir(GENERATIONS_DIR)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    activate(generation, check=False)
+    prune(keep)
+    return generation
+
+
+def link(filename: str, directory: str, generation: str | None = None) -> bool:
+    """Hard-link ``filename`` of a published generation (default: the current one)
+    into a staging ``directory``; copy it where links are not supported.
+    Returns False if there is no such file to reuse."""
+    try:
+        source = os.path.join(path(generation or current()), filename)
+    except GenerationError:
+        return False
+    if not os.path.exists(source):
+        return False
+    target = os.path.join(directory, filename)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return True
+
+
+def rollback(to: str | None = None) -> str:
+    """Point readers back at ``to`` (default: the generation published before the current one)."""
+    published = list_generations()
+    if to is None:
+        active = current()
+        older = [g for g in published if g < active]
+        if not older:
+            raise GenerationError(f"No generation older than {active} to roll back to")
+        to = older[-1]
+    elif to not in published:
+        raise GenerationError(f"Unknown generation {to}")
+    activate(to)
+    return to
+
+
+def prune(keep: int = KEEP) -> list[str]:
+    """Delete all but the ``keep`` newest generations (never the current one)."""
+    active = current()
+    published = list_generations()
+    removed = [g for g in published[:-keep] if g != active] if keep > 0 else []
+    for generation in removed:
+        shutil.rmtree(path(generation), ignore_errors=True)
+    return removed
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect, verify or roll back published data generations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list generations (* = current)")
+    p_rollback = sub.add_parser("rollback", help="point readers back at an older generation")
+    p_rollback.add_argument("generation", nargs="?")
+    p_verify = sub.add_parser("verify", help="re-hash a generation against its manifest")
+    p_verify.add_argument("generation", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        active = current() if os.path.exists(CURRENT_PATH) else None
+        for generation in list_generations():
+            files = read_manifest(generation)["files"]
+            rows = sum(f["rows"] for f in files.values() if isinstance(f["rows"], int))
+            print(f"{'*' if generation == active else ' '} {generation}  {len(files)} files, {rows} parquet rows")
+    elif args.command == "rollback":
+        print(f"Current generation: {rollback(args.generation)}")
+    else:
+        generation = args.generation or current()
+        problems = verify(generation)
+        for problem in problems:
+            print(f"  {problem}")
+        print(f"{generation}: {'OK' if not problems else f'{len(problems)} problem(s)'}")
+        if problems:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
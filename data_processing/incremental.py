@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Incremental (delta) refresh of the player tables.
+
+A new nba_api pull is compared with the previous one row by row: rows are
+keyed on PLAYER_ID (+ TEAM_ABBREVIATION, since a traded player can appear
+once per team) and fingerprinted with a per-row hash. Only inserted, updated
+and deleted rows are appended to a per-table log; the log is folded into the
+base snapshot every ``COMPACT_EVERY`` segments:
+
+    data/delta/<table>/base.parquet
+    data/delta/<table>/log/000001.parquet   (_OP = I / U / D)
+    data/delta/changes.json                 (last refresh: counts, players, teams)
+
+changes.json lists the PLAYER_IDs and team abbreviations touched by the last
+refresh so derived tables can recompute only those (see ``patch``).
+Used by the pipeline's ``ingest`` stage when run with ``--delta``. An empty
+delta leaves the player tables unchanged, so the pipeline skips ``publish``;
+otherwise ``publish`` only rewrites the patched tables and links the others
+from the current generation.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+# -------------------------------
+# Config
+# -------------------------------
+DELTA_DIR = "data/delta"
+CHANGES_PATH = os.path.join(DELTA_DIR, "changes.json")
+KEY = ["PLAYER_ID", "TEAM_ABBREVIATION"]
+COMPACT_EVERY = 20
+HASH_COL, OP_COL = "_ROW_HASH", "_OP"
+
+
+# -------------------------------
+# Diff
+# -------------------------------
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """One uint64 per row (vectorized). League-wide *_RANK columns are left out:
+    they shift for everyone as soon as one player's line changes."""
+    cols = [c for c in df.columns if not str(c).endswith("_RANK")]
+    return pd.util.hash_pandas_object(df[cols], index=False)
+
+
+@dataclass
+class ChangeSet:
+    table: str
+    inserted: pd.DataFrame
+    updated: pd.DataFrame
+    deleted: pd.DataFrame  # KEY columns only
+
+    @property
+    def empty(self) -> bool:
+        return self.inserted.empty and self.updated.empty and self.deleted.empty
+
+    def keys(self) -> pd.DataFrame:
+        """Every touched key with its operation (I / U / D)."""
+        return pd.concat([
+            self.inserted[KEY].assign(OP="I"),
+            self.updated[KEY].assign(OP="U"),
+            self.deleted[KEY].assign(OP="D"),
+        ], ignore_index=True)
+
+    def summary(self) -> dict:
+        return {"inserted": len(self.inserted), "updated": len(self.updated), "deleted": len(self.deleted)}
+
+
+def has_unique_key(df: pd.DataFrame) -> bool:
+    return all(c in df.columns for c in KEY) and not df.duplicated(subset=KEY).any()
+
+
+def diff(table: str, old: pd.DataFrame, new: pd.DataFrame) -> ChangeSet:
+    """Rows of ``new`` that are inserted/updated compared with ``old``, and keys deleted from it."""
+    old_h = pd.DataFrame({HASH_COL: row_hashes(old).values}, index=pd.MultiIndex.from_frame(old[KEY]))
+    new_h = pd.DataFrame({HASH_COL: row_hashes(new).values}, index=pd.MultiIndex.from_frame(new[KEY]))
+
+    in_old = new_h.index.isin(old_h.index)
+    same = in_old.copy()
+    same[in_old] = old_h.loc[new_h.index[in_old], HASH_COL].values == new_h[HASH_COL].values[in_old]
+
+    deleted = old_h.index[~old_h.index.isin(new_h.index)].to_frame(index=False)
+    return ChangeSet(
+        table,
+        inserted=new[~in_old].reset_index(drop=True),
+        updated=new[in_old & ~same].reset_index(drop=True),
+        deleted=deleted[KEY] if len(deleted) else old[KEY].iloc[0:0],
+    )
+
+
+def full(table: str, new: pd.DataFrame) -> ChangeSet:
+    """Every row counts as inserted (first run, or rebuild from scratch)."""
+    return ChangeSet(table, new.reset_index(drop=True), new.iloc[0:0], new[KEY].iloc[0:0])
+
+
+# -------------------------------
+# Append log
+# -------------------------------
+class DeltaTable:
+    """Base snapshot + append-only log of changed rows for one table."""
+
+    def __init__(self, name: str, root: str = DELTA_DIR):
+        self.name = name
+        self.dir = os.path.join(root, name)
+        self.base_path = os.path.join(self.dir, "base.parquet")
+        self.log_dir = os.path.join(self.dir, "log")
+
+    def segments(self) -> list[str]:
+        if not os.path.isdir(self.log_dir):
+            return []
+        return sorted(os.path.join(self.log_dir, f) for f in os.listdir(self.log_dir) if f.endswith(".parquet"))
+
+    def read(self) -> pd.DataFrame | None:
+        """Current rows: base snapshot with every log segment applied in order."""
+        if not os.path.exists(self.base_path):
+            return None
+        df = pd.read_parquet(self.base_path)
+        for path in self.segments():
+            seg = pd.read_parquet(path)
+            touched = pd.MultiIndex.from_frame(seg[KEY])
+            df = df[~pd.MultiIndex.from_frame(df[KEY]).isin(touched)]
+            upserts = seg[seg[OP_COL] != "D"].drop(columns=[OP_COL])
+            df = pd.concat([df, upserts], ignore_index=True)
+        return df.reset_index(drop=True)
+
+    def reset(self, df: pd.DataFrame) -> None:
+        """Replace the base snapshot and drop the log."""
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self.base_path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self.base_path)
+        for path in self.segments():
+            os.remove(path)
+
+    def append(self, changes: ChangeSet) -> str | None:
+        """Write one log segment holding only the changed rows (and delete tombstones)."""
+        if changes.empty:
+            return None
+        seg = pd.concat([
+            changes.inserted.assign(**{OP_COL: "I"}),
+            changes.updated.assign(**{OP_COL: "U"}),
+            changes.deleted.assign(**{OP_COL: "D"}),
+        ], ignore_index=True)
+        os.makedirs(self.log_dir, exist_ok=True)
+        segments = self.segments()
+        seq = int(os.path.basename(segments[-1])[:-8]) + 1 if segments else 1
+        path = os.path.join(self.log_dir, f"{seq:06d}.parquet")
+        seg.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        return path
+
+    def compact(self) -> None:
+        df = self.read()
+        if df is not None:
+            self.reset(df)
+
+
+def record(changes: ChangeSet, new: pd.DataFrame, rebuild: bool = False) -> None:
+    """Persist a refresh of one table: reset on rebuild, else append + periodic compaction."""
+    table = DeltaTable(changes.table)
+    if rebuild or not os.path.exists(table.base_path):
+        table.reset(new)
+        return
+    table.append(changes)
+    if len(table.segments()) >= COMPACT_EVERY:
+        table.compact()
+
+
+def publish_changes(changesets: list[ChangeSet], **meta) -> dict:
+    """Write changes.json: per-table counts plus the players and teams touched."""
+    keys = pd.concat([c.keys() for c in changesets], ignore_index=True) if changesets else pd.DataFrame(columns=KEY)
+    payload = {
+        "refreshed_at": time.time(),
+        **meta,
+        "tables": {c.table: c.summary() for c in changesets},
+        "players": sorted(int(p) for p in keys["PLAYER_ID"].unique()),
+        "teams": sorted(str(t) for t in keys["TEAM_ABBREVIATION"].unique()),
+    }
+    os.makedirs(DELTA_DIR, exist_ok=True)
+    with open(CHANGES_PATH + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(CHANGES_PATH + ".tmp", CHANGES_PATH)
+    return payload
+
+
+def load_changes() -> dict | None:
+    if not os.path.exists(CHANGES_PATH):
+        return None
+    with open(CHANGES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------------------
+# Derived tables
+# -------------------------------
+def patch(previous: pd.DataFrame, current: pd.DataFrame, changes: pd.DataFrame, transform) -> pd.DataFrame:
+    """Recompute a row-wise derived table only for the keys listed in ``changes``.
+
+    ``previous`` is transform(old source), ``current`` the new source and
+    ``changes`` its KEY + OP rows; the result equals transform(current), in
+    the same row order, without re-deriving unchanged rows.
+    """
+    touched = pd.MultiIndex.from_frame(changes[KEY])
+    upserts = pd.MultiIndex.from_frame(changes.loc[changes["OP"] != "D", KEY])
+
+    keep = previous[~pd.MultiIndex.from_frame(previous[KEY]).isin(touched)]
+    fresh = transform(current[pd.MultiIndex.from_frame(current[KEY]).isin(upserts)])
+    result = pd.concat([keep, fresh], ignore_index=True)
+
+    # Restore the source order so the result is identical to a full rebuild
+    order = pd.Series(range(len(current)), index=pd.MultiIndex.from_frame(current[KEY]))
+    position = order.reindex(pd.MultiIndex.from_frame(result[KEY])).values
+    return result.iloc[position.argsort(kind="stable")].reset_index(drop=True)
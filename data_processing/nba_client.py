@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Shared access to stats.nba.com: one pooled HTTP session, one token-bucket
+rate limiter and jittered exponential backoff for every nba_api call.
+
+    from data_processing.nba_client import fetch_many
+    results = fetch_many({team_id: lambda t=team_id: api_cache.call(...)}, workers=6)
+
+Only real network requests (``send``) take a token from the limiter, so
+cache hits served by ``api_cache`` are never throttled.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+import requests
+from requests.adapters import HTTPAdapter
+from nba_api.stats.library.http import NBAStatsHTTP
+
+# -------------------------------
+# Config
+# -------------------------------
+RATE_PER_SEC = 2.0     # sustained requests per second against stats.nba.com
+BURST = 4              # requests allowed back-to-back before throttling
+WORKERS = 6
+RETRIES = 4
+BACKOFF_BASE = 0.5     # seconds; doubled at each attempt, full jitter
+BACKOFF_CAP = 8.0
+TIMEOUT = 30
+
+
+class RateLimiter:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``burst`` saved."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, burst: int = BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = RateLimiter()
+_session_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    return _limiter
+
+
+def get_session(pool_size: int = WORKERS) -> requests.Session:
+    """Pooled keep-alive session installed as nba_api's stats session (created once)."""
+    with _session_lock:
+        session = NBAStatsHTTP._session
+        if getattr(session, "_nba_pooled", False):
+            return session
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session._nba_pooled = True
+        NBAStatsHTTP.set_session(session)
+        return session
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class PermanentError(Exception):
+    """Failure that retrying cannot fix (e.g. a response missing in replay mode)."""
+
+
+def send(endpoint) -> None:
+    """Fire one nba_api endpoint request (built with get_request=False) under the limiter."""
+    get_session()
+    _limiter.acquire()
+    endpoint.get_request()
+
+
+def call_with_retry(fn: Callable[[], Any], retries: int = RETRIES) -> tuple[Any, int]:
+    """Call ``fn``, retrying with jittered backoff. Returns (value, attempts)."""
+    for attempt in range(retries):
+        try:
+            return fn(), attempt + 1
+        except PermanentError:
+            raise
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+@dataclass
+class FetchResult:
+    key: Hashable
+    value: Any = None
+    error: str | None = None
+    attempts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def fetch_many(tasks: dict[Hashable, Callable[[], Any]], workers: int = WORKERS,
+               retries: int = RETRIES,
+               on_progress: Callable[[int, int, FetchResult], None] | None = None) -> dict[Hashable, FetchResult]:
+    """Run independent nba_api calls on a bounded pool sharing one limiter and session.
+
+    ``on_progress(done, total, result)`` is called from the caller's thread as
+    each task finishes (successfully or not).
+    """
+    get_session(workers)
+    results: dict[Hashable, FetchResult] = {}
+
+    def run(key, fn) -> FetchResult:
+        start = time.perf_counter()
+        try:
+            value, attempts = call_with_retry(fn, retries)
+            return FetchResult(key, value, None, attempts, time.perf_counter() - start)
+        except PermanentError as exc:
+            return FetchResult(key, None, f"{type(exc).__name__}: {exc}", 1,
+                               time.perf_counter() - start)
+        except Exception as exc:
+            return FetchResult(key, None, f"{type(exc).__name__}: {exc}", retries,
+                               time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, key, fn) for key, fn in tasks.items()]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[result.key] = result
+            if on_progress:
+                on_progress(done, len(tasks), result)
+    return results
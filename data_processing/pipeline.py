@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""Staged data pipeline: ingest -> players -> filter -> publish.
+
+Replaces running processing.py, processing_v2.py and processing_v3.py by hand.
+Each stage declares the artifacts it reads and writes; the runner records a
+content hash of every stage's inputs (upstream artifacts, source files, params
+and the stage's own code) and of its outputs, and only reruns the stages whose
+inputs changed. Intermediate artifacts are pickled in data/.pipeline/ so a
+skipped stage never has to re-read Excel or call nba_api.
+
+Run from the repository root:
+
+    python -m data_processing.pipeline              # run stale stages only
+    python -m data_processing.pipeline --dry-run    # show the plan
+    python -m data_processing.pipeline --refresh ingest
+    python -m data_processing.pipeline --force      # rerun everything
+    python -m data_processing.pipeline --force --api-mode replay   # offline rebuild
+    python -m data_processing.pipeline --refresh ingest --delta    # daily in-season refresh
+    python -m data_processing.pipeline --excel      # also export every table to .xlsx
+
+The ``publish`` stage writes the Parquet dataset and the DuckDB store as one
+new generation and switches data/current to it atomically (generations.py);
+pages only read the current generation. Excel is only an export.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Callable
+
+import pandas as pd
+
+from data_processing import (api_cache, contracts, dataset, derive, generations, incremental, processing,
+                             processing_v2, processing_v3, teams, warehouse)
+
+# -------------------------------
+# Config
+# -------------------------------
+STATE_DIR = "data/.pipeline"
+STATE_PATH = os.path.join(STATE_DIR, "state.json")
+ARTIFACT_DIR = os.path.join(STATE_DIR, "artifacts")
+
+DEFAULT_PARAMS = {
+    "season": processing.SEASON,
+    "delta": False,
+    "excel": False,
+}
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the pipeline graph.
+
+    inputs/outputs are artifact names (DataFrames passed between stages),
+    sources/targets are files read from / written to disk and code lists the
+    functions or modules (besides ``run``) whose source is part of the fingerprint.
+    External stages (network) have no file inputs to hash, so they are
+    refetched after ``max_age`` seconds or when asked with --refresh.
+    """
+    name: str
+    run: Callable[..., dict]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    sources: tuple[str, ...] = ()
+    targets: tuple[str, ...] = ()
+    params: tuple[str, ...] = ()
+    code: tuple[Callable, ...] = ()
+    max_age: float | None = None
+
+
+@dataclass
+class StageContext:
+    """What a stage may know about its own previous run (for incremental work)."""
+    stage: Stage
+    record: dict | None
+    state: dict
+    code: str
+
+    @property
+    def same_code(self) -> bool:
+        return self.record is not None and self.record.get("code") == self.code
+
+    def previous_output(self, name: str) -> pd.DataFrame | None:
+        """This stage's last output ``name``, if any."""
+        if name not in self.stage.outputs or not os.path.exists(artifact_path(name)):
+            return None
+        return pd.read_pickle(artifact_path(name))
+
+    def output_hash(self, name: str) -> str | None:
+        """Hash of this stage's last output ``name`` (before the current run replaces it)."""
+        return self.state["artifacts"].get(name)
+
+    def input_hash(self, name: str) -> str | None:
+        return self.state["artifacts"].get(name)
+
+    def consumed(self, name: str) -> str | None:
+        """Hash of input ``name`` as it was when this stage last ran."""
+        return (self.record or {}).get("inputs", {}).get(name)
+
+
+# -------------------------------
+# Stage bodies
+# -------------------------------
+INGEST_TABLES = {
+    "reg_season_players_api": "Regular Season",
+    "playoff_players_api": "Playoffs",
+}
+PLAYER_TABLES = {
+    "reg_season_players_api": "reg_season_players",
+    "playoff_players_api": "playoff_players",
+}
+
+
+def run_ingest(inputs: dict, params: dict, ctx: StageContext) -> dict:
+    """Fetch player stats and the player index (positions, bio).
+
+    In delta mode the stats are diffed with the previous pull by key + row hash.
+    """
+    outputs, changesets, change_rows = {}, [], []
+    for name, season_type in INGEST_TABLES.items():
+        new = processing.fetch_player_stats(params["season"], season_type)
+        old = ctx.previous_output(name) if params["delta"] else None
+
+        if old is not None and incremental.has_unique_key(old) and incremental.has_unique_key(new):
+            changes = incremental.diff(name, old, new)
+            incremental.record(changes, new)
+            change_rows.append(changes.keys().assign(TABLE=name, BASE=ctx.output_hash(name)))
+        else:
+            changes = incremental.full(name, new)
+            incremental.record(changes, new, rebuild=True)
+        changesets.append(changes)
+        outputs[name] = new
+        print(f"  {name}: {changes.summary()}")
+
+    outputs["player_info"] = processing_v2.fetch_player_info(params["season"])
+    print(f"  player_info: {len(outputs['player_info'])} players")
+
+    if params["delta"]:
+        incremental.publish_changes(changesets, season=params["season"])
+    outputs["player_changes"] = (
+        pd.concat(change_rows, ignore_index=True) if change_rows
+        else pd.DataFrame(columns=["PLAYER_ID", "TEAM_ABBREVIATION", "OP", "TABLE", "BASE"])
+    )
+    return outputs
+
+
+def run_players(inputs: dict, params: dict, ctx: StageContext) -> dict:
+    """Derive player tables (stats + positions/bio), re-deriving only changed rows after a delta ingest."""
+    info = inputs["player_info"]
+    same_info = ctx.consumed("player_info") == ctx.input_hash("player_info")
+
+    def transform(df: pd.DataFrame) -> pd.DataFrame:
+        return processing_v2.add_player_info(processing.build_players_frame(df), info)
+
+    outputs = {}
+    for api, table in PLAYER_TABLES.items():
+        previous = ctx.previous_output(table) if ctx.same_code and same_info else None
+        changes = inputs["player_changes"]
+        changes = changes[changes["TABLE"] == api]
+
+        if previous is not None and ctx.consumed(api) == ctx.input_hash(api):
+            outputs[table] = previous
+        elif previous is not None and len(changes) and (changes["BASE"] == ctx.consumed(api)).all():
+            outputs[table] = incremental.patch(previous, inputs[api], changes, transform)
+        else:
+            outputs[table] = transform(inputs[api])
+    return outputs
+
+
+def run_sources(inputs: dict, params: dict, ctx: StageContext) -> dict:
+    return processing.load_sources()
+
+
+def run_filter(inputs: dict, params: dict, ctx: StageContext) -> dict:
+    return {
+        "reg_season_players_filtered": processing_v3.clean_players(inputs["reg_season_players"]),
+        "playoff_players_filtered": processing_v3.clean_players(inputs["playoff_players"]),
+    }
+
+
+def run_publish(inputs: dict, params: dict, ctx: StageContext) -> dict:
+    """Write the dataset and the DuckDB store as one generation, then switch readers to it.
+
+    Tables whose artifact is unchanged since the current generation are linked from it,
+    not rewritten: after a delta refresh only the patched player tables get new files,
+    and readers keep their cached copy of the others (core/data.py keys tables by hash).
+    """
+    hashes = {name: ctx.input_hash(name) for name in inputs}
+    published = {}
+    if not params["excel"]:  # the Excel export is always complete
+        try:
+            published = generations.read_manifest(generations.current())["meta"].get("inputs", {})
+        except (generations.GenerationError, OSError):
+            pass
+
+    def write(directory: str) -> None:
+        changed, linked = {}, 0
+        for name, df in inputs.items():
+            if published.get(name) == hashes[name] and generations.link(
+                    os.path.basename(dataset.path(name, directory)), directory):
+                linked += 1
+                continue
+            changed[name] = df
+        print(f"Unchanged (linked): {linked} table(s)")
+        processing.export_frames(changed, directory, excel=params["excel"])
+        warehouse.build(inputs, params["season"], os.path.join(directory, warehouse.DB_FILE))
+
+    generation = generations.publish(write, meta={"season": params["season"], "inputs": hashes})
+    print(f"Published: {generations.path(generation)}")
+    return {}
+
+
+SOURCE_ARTIFACTS = tuple(processing.SOURCE_FILES) + ("contracts", "nba_teams")
+PLAYER_ARTIFACTS = ("reg_season_players", "playoff_players",
+                    "reg_season_players_filtered", "playoff_players_filtered")
+
+STAGES = [
+    Stage("ingest", run_ingest,
+          outputs=("reg_season_players_api", "playoff_players_api", "player_info", "player_changes"),
+          params=("season",), max_age=24 * 3600),
+    Stage("players", run_players,
+          inputs=("reg_season_players_api", "playoff_players_api", "player_info", "player_changes"),
+          outputs=("reg_season_players", "playoff_players"),
+          code=(processing.build_players_frame, derive.derive, incremental.patch, teams,
+                processing_v2.add_player_info)),
+    Stage("sources", run_sources,
+          outputs=SOURCE_ARTIFACTS,
+          sources=tuple(processing.SOURCE_FILES.values()),
+          code=(processing.load_sources, contracts, teams)),
+    Stage("filter", run_filter,
+          inputs=("reg_season_players", "playoff_players"),
+          outputs=("reg_season_players_filtered", "playoff_players_filtered"),
+          code=(processing_v3.clean_players,)),
+    # No targets: a rollback moves data/current back and must not trigger a republish
+    Stage("publish", run_publish,
+          inputs=SOURCE_ARTIFACTS + PLAYER_ARTIFACTS,
+          params=("season", "excel"),
+          code=(processing.export_frames, dataset, warehouse, generations)),
+]
+
+
+# -------------------------------
+# Hashing
+# -------------------------------
+def hash_frame(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, index, column names and dtypes)."""
+    h = hashlib.sha256()
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def hash_file(path: str) -> str | None:
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_json(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# -------------------------------
+# Runner
+# -------------------------------
+def load_state() -> dict:
+    if not os.path.exists(STATE_PATH):
+        return {"stages": {}, "artifacts": {}}
+    with open(STATE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state: dict) -> None:
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def artifact_path(name: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"{name}.pkl")
+
+
+def order_stages(stages: list[Stage]) -> list[Stage]:
+    """Topological order from the artifacts each stage consumes/produces."""
+    producer = {out: s.name for s in stages for out in s.outputs}
+    graph = {s.name: {producer[i] for i in s.inputs} for s in stages}
+    by_name = {s.name: s for s in stages}
+    return [by_name[name] for name in TopologicalSorter(graph).static_order()]
+
+
+def code_hash(stage: Stage) -> str:
+    return hash_json([inspect.getsource(fn) for fn in (stage.run,) + stage.code])
+
+
+def stage_fingerprint(stage: Stage, state: dict, params: dict) -> str:
+    return hash_json({
+        "code": code_hash(stage),
+        "params": {p: params[p] for p in stage.params},
+        "inputs": {i: state["artifacts"].get(i) for i in stage.inputs},
+        "sources": {p: hash_file(p) for p in stage.sources},
+    })
+
+
+def stale_reason(stage: Stage, record: dict | None, fingerprint: str, state: dict) -> str | None:
+    """Why the stage must run, or None when its recorded outputs are still valid."""
+    if record is None:
+        return "never run"
+    if record["fingerprint"] != fingerprint:
+        return "inputs changed"
+    for out in stage.outputs:
+        if out not in state["artifacts"] or not os.path.exists(artifact_path(out)):
+            return f"artifact {out} missing"
+    for path in stage.targets:
+        if hash_file(path) != record["targets"].get(path):
+            return f"{path} missing or modified"
+    if stage.max_age is not None and time.time() - record["finished_at"] > stage.max_age:
+        return "older than max_age"
+    return None
+
+
+def run_pipeline(params: dict | None = None, refresh=(), force: bool = False,
+                 dry_run: bool = False, stages: list[Stage] | None = None) -> list[str]:
+    """Run every stale stage in dependency order; return the names of the stages that ran."""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    stages = order_stages(stages or STAGES)
+    unknown = set(refresh) - {s.name for s in stages}
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    state = load_state()
+    frames: dict[str, pd.DataFrame] = {}
+    ran = []
+
+    def get_artifact(name: str) -> pd.DataFrame:
+        if name not in frames:
+            frames[name] = pd.read_pickle(artifact_path(name))
+        return frames[name]
+
+    for stage in stages:
+        record = state["stages"].get(stage.name)
+        fingerprint = stage_fingerprint(stage, state, params)
+        reason = "forced" if force or stage.name in refresh else stale_reason(stage, record, fingerprint, state)
+        if reason is None:
+            print(f"[skip] {stage.name}")
+            continue
+        print(f"[run ] {stage.name} ({reason})")
+        if dry_run:
+            continue
+
+        start = time.perf_counter()
+        ctx = StageContext(stage, record, state, code_hash(stage))
+        outputs = stage.run({i: get_artifact(i) for i in stage.inputs}, params, ctx)
+
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        for name in stage.outputs:
+            df = outputs[name]
+            frames[name] = df
+            df.to_pickle(artifact_path(name))
+            state["artifacts"][name] = hash_frame(df)
+
+        state["stages"][stage.name] = {
+            "fingerprint": fingerprint,
+            "code": ctx.code,
+            "inputs": {i: state["artifacts"].get(i) for i in stage.inputs},
+            "targets": {p: hash_file(p) for p in stage.targets},
+            "finished_at": time.time(),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        save_state(state)  # persist after each stage so a crash keeps finished work
+        ran.append(stage.name)
+
+    return ran
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run the NBA data pipeline (only stale stages).")
+    parser.add_argument("--season", default=DEFAULT_PARAMS["season"])
+    parser.add_argument("--refresh", nargs="*", default=[], metavar="STAGE",
+                        help="rerun these stages even if their inputs did not change")
+    parser.add_argument("--force", action="store_true", help="rerun every stage")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    parser.add_argument("--delta", action="store_true",
+                        help="diff the new pull with the previous one and only re-derive changed rows")
+    parser.add_argument("--excel", action="store_true",
+                        help="also export every table to .xlsx in the published generation")
+    parser.add_argument("--api-mode", choices=api_cache.MODES, default=api_cache.get_mode(),
+                        help="nba_api response cache: live (TTL cache), record or replay (offline)")
+    args = parser.parse_args(argv)
+    api_cache.set_mode(args.api_mode)
+
+    start = time.perf_counter()
+    params = {"season": args.season, "delta": args.delta, "excel": args.excel}
+    ran = run_pipeline(params, refresh=set(args.refresh), force=args.force, dry_run=args.dry_run)
+    print(f"Done in {time.perf_counter() - start:.1f}s — {len(ran)} stage(s) ran.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,51 @@
 # processing_v2.py
 # -*- coding: utf-8 -*-
-"""Second pass: add/normalize player positions, preview, then overwrite Excel."""
+"""Second pass: player positions and bio (height, weight, draft).
+
+Everything comes from one league-wide PlayerIndex call made during the
+``ingest`` stage of ``data_processing.pipeline`` (instead of one
+CommonTeamRoster call per team); the ``players`` stage merges it into the
+player tables.
+"""
 
-import time
 import pandas as pd
-import streamlit as st
-from nba_api.stats.static import teams
-from nba_api.stats.endpoints import commonteamroster
+
+from data_processing import api_cache
+from data_processing.nba_client import call_with_retry
 
 # -------------------------------
 # Config
 # -------------------------------
 SEASON   = "2024-25"
-REG_PATH = "data/df_reg_season_players.xlsx"
-PO_PATH  = "data/df_playoff_players.xlsx"
-
-st.set_page_config(layout="wide")
-st.title("Processing v2 — Add Player Positions")
 
-# -------------------------------
-# Load existing data
-# -------------------------------
-df_reg = pd.read_excel(REG_PATH)
-df_po  = pd.read_excel(PO_PATH)
+PLAYER_INFO_COLUMNS = ["PLAYER_ID", "POSITION", "HEIGHT", "WEIGHT",
+                       "DRAFT_YEAR", "DRAFT_ROUND", "DRAFT_NUMBER"]
 
-st.dataframe(df_reg)
-st.dataframe(df_po)
 
 # -------------------------------
-# Fetch roster positions (retry + throttle, still simple)
+# Fetch positions + bio (one bulk call)
 # -------------------------------
-pos_frames = []
-failed = []
-
-team_list = teams.get_teams()
-progress = st.progress(0)
-total = len(team_list)
+def fetch_player_info(season: str = SEASON) -> pd.DataFrame:
+    """One row per player of the season with the raw POSITION code, height, weight and draft info."""
+    from nba_api.stats.endpoints import playerindex  # heavy package, only needed for the fetch
 
-for i, t in enumerate(team_list, start=1):
-    team_id = t["id"]
-    name = t.get("full_name", t.get("abbreviation", str(team_id)))
+    endpoint, _ = call_with_retry(lambda: api_cache.call(
+        playerindex.PlayerIndex, season=season, league_id="00", timeout=30
+    ))
+    df = endpoint.get_data_frames()[0].rename(columns={"PERSON_ID": "PLAYER_ID"})
 
-    got = False
-    for attempt in range(4):  # try up to 4 times
-        try:
-            roster = commonteamroster.CommonTeamRoster(
-                team_id=team_id, season=SEASON, timeout=90
-            ).get_data_frames()[0]
-            pos_frames.append(roster[["PLAYER_ID", "PLAYER", "POSITION"]])
-            got = True
-            break
-        except Exception:
-            time.sleep(0.8 * (attempt + 1))  # short backoff: 0.8s, 1.6s, 2.4s
-    if not got:
-        failed.append(name)
-
-    time.sleep(0.5)  # gentle throttle between teams
-    progress.progress(i / total)
-
-if failed:
-    st.warning(f"Could not fetch roster for: {', '.join(failed)}")
-
-if not pos_frames:
-    st.error("No roster data fetched after retries. Try again in a minute.")
-    st.stop()
-
-df_positions = pd.concat(pos_frames, ignore_index=True)
-
-# Keep only what's needed and ensure one row per player
-df_positions = (
-    df_positions[["PLAYER_ID", "POSITION"]]
-    .dropna(subset=["PLAYER_ID"])
-    .drop_duplicates(subset=["PLAYER_ID"], keep="last")
-)
-
-# -------------------------------
-# Merge positions (left join on PLAYER_ID)
-# -------------------------------
-df_reg = df_reg.merge(df_positions, how="left", on="PLAYER_ID", validate="m:1")
-df_po  = df_po.merge(df_positions, how="left", on="PLAYER_ID", validate="m:1")
-
-#st.dataframe(df_reg)
-#st.dataframe(df_po)
-
-
-# If the merge produced POSITION_x / POSITION_y, rename the one from roster to POS
-if "POSITION_x" in df_reg.columns:
-    df_reg.rename(columns={"POSITION_x": "POS"}, inplace=True)
-if "POSITION_x" in df_po.columns:
-    df_po.rename(columns={"POSITION_x": "POS"}, inplace=True)
-
-# Drop any leftover POSITION_y to avoid confusion
-for df_ in (df_reg, df_po):
-    if "POSITION_y" in df_.columns:
-        df_.drop(columns=["POSITION_y"], inplace=True)
+    # Typed columns: undrafted players have no draft year/round/number
+    df["WEIGHT"] = pd.to_numeric(df["WEIGHT"], errors="coerce").astype("Int64")
+    for col in ["DRAFT_YEAR", "DRAFT_ROUND", "DRAFT_NUMBER"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
 
+    # Keep only what's needed and ensure one row per player
+    return (
+        df[PLAYER_INFO_COLUMNS]
+        .dropna(subset=["PLAYER_ID"])
+        .drop_duplicates(subset=["PLAYER_ID"], keep="last")
+        .reset_index(drop=True)
+    )
 
 
 # -------------------------------
@@ -110,19 +61,13 @@ position_map = {
     "C-F": "Center",
 }
 
-# Make sure POS is a Series (single column) before mapping
-df_reg["POSITION"] = df_reg["POS"].map(position_map).fillna("Unknown")
-df_po["POSITION"]  = df_po["POS"].map(position_map).fillna("Unknown")
-
-"""# -------------------------------
-# Overwrite Excel files
-# -------------------------------
-df_reg.to_excel(REG_PATH, index=False)
-df_po.to_excel(PO_PATH, index=False)
-
-st.success("Excel files updated with POS (raw) and POSITION (friendly)")
-st.write(f"- {REG_PATH}")
-st.write(f"- {PO_PATH}")
 
-st.dataframe(df_po[["PLAYER_NAME","TEAM","POS","POSITION"]])
-st.dataframe(df_reg[["PLAYER_NAME","TEAM","POS","POSITION"]])"""
+def add_player_info(df: pd.DataFrame, df_info: pd.DataFrame) -> pd.DataFrame:
+    """Left join player info on PLAYER_ID: POS (raw code), POSITION (friendly), height, weight, draft."""
+    df = df.drop(columns=["POS", *PLAYER_INFO_COLUMNS[1:]], errors="ignore")
+    df = df.merge(
+        df_info.rename(columns={"POSITION": "POS"}),
+        how="left", on="PLAYER_ID", validate="m:1"
+    )
+    df.insert(df.columns.get_loc("POS") + 1, "POSITION", df["POS"].map(position_map).fillna("Unknown"))
+    return df
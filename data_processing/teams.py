@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Canonical team dimension.
+
+One row per franchise with a small-int surrogate key (TEAM_KEY, 1..30), the
+stats.nba.com abbreviation (TM), the full name (TEAM), the nba_api team id
+and the conference / division. Every spelling met in the sources maps to the
+key: Basketball-Reference abbreviations (PHO, BRK, CHO), full names, and the
+former names of a franchise (Seattle SuperSonics -> OKC, New Jersey Nets ->
+BKN, ...), so champions history resolves too.
+
+Every dataset carries the key as a categorical column (``KEY_DTYPE``): joins
+and team filters compare int8 codes instead of strings.
+
+    df["TEAM_KEY"] = teams.to_key(df["TM"])
+    df[df["TEAM_KEY"] == teams.key("PHO")]
+"""
+
+import pandas as pd
+
+# -------------------------------
+# Dimension
+# -------------------------------
+# TEAM_KEY, TM, TEAM, NBA_TEAM_ID, CONF, DIV, other spellings
+TEAMS = [
+    (1, "ATL", "Atlanta Hawks", 1610612737, "East", "Southeast", ("St. Louis Hawks",)),
+    (2, "BOS", "Boston Celtics", 1610612738, "East", "Atlantic", ()),
+    (3, "BKN", "Brooklyn Nets", 1610612751, "East", "Atlantic", ("BRK", "NJN", "New Jersey Nets")),
+    (4, "CHA", "Charlotte Hornets", 1610612766, "East", "Southeast", ("CHO", "CHH", "Charlotte Bobcats")),
+    (5, "CHI", "Chicago Bulls", 1610612741, "East", "Central", ()),
+    (6, "CLE", "Cleveland Cavaliers", 1610612739, "East", "Central", ()),
+    (7, "DAL", "Dallas Mavericks", 1610612742, "West", "Southwest", ()),
+    (8, "DEN", "Denver Nuggets", 1610612743, "West", "Northwest", ()),
+    (9, "DET", "Detroit Pistons", 1610612765, "East", "Central", ()),
+    (10, "GSW", "Golden State Warriors", 1610612744, "West", "Pacific", ("GS", "Philadelphia Warriors", "San Francisco Warriors")),
+    (11, "HOU", "Houston Rockets", 1610612745, "West", "Southwest", ("San Diego Rockets",)),
+    (12, "IND", "Indiana Pacers", 1610612754, "East", "Central", ()),
+    (13, "LAC", "Los Angeles Clippers", 1610612746, "West", "Pacific", ("LA Clippers", "San Diego Clippers")),
+    (14, "LAL", "Los Angeles Lakers", 1610612747, "West", "Pacific", ("Minneapolis Lakers",)),
+    (15, "MEM", "Memphis Grizzlies", 1610612763, "West", "Southwest", ("VAN", "Vancouver Grizzlies")),
+    (16, "MIA", "Miami Heat", 1610612748, "East", "Southeast", ()),
+    (17, "MIL", "Milwaukee Bucks", 1610612749, "East", "Central", ()),
+    (18, "MIN", "Minnesota Timberwolves", 1610612750, "West", "Northwest", ()),
+    (19, "NOP", "New Orleans Pelicans", 1610612740, "West", "Southwest", ("NO", "NOH", "NOK", "New Orleans Hornets",
+                                                                          "New Orleans/Oklahoma City Hornets")),
+    (20, "NYK", "New York Knicks", 1610612752, "East", "Atlantic", ("NY",)),
+    (21, "OKC", "Oklahoma City Thunder", 1610612760, "West", "Northwest", ("SEA", "Seattle SuperSonics")),
+    (22, "ORL", "Orlando Magic", 1610612753, "East", "Southeast", ()),
+    (23, "PHI", "Philadelphia 76ers", 1610612755, "East", "Atlantic", ("Syracuse Nationals",)),
+    (24, "PHX", "Phoenix Suns", 1610612756, "West", "Pacific", ("PHO",)),
+    (25, "POR", "Portland Trail Blazers", 1610612757, "West", "Northwest", ()),
+    (26, "SAC", "Sacramento Kings", 1610612758, "West", "Pacific", ("Kansas City Kings", "Rochester Royals")),
+    (27, "SAS", "San Antonio Spurs", 1610612759, "West", "Southwest", ("SA",)),
+    (28, "TOR", "Toronto Raptors", 1610612761, "East", "Atlantic", ()),
+    (29, "UTA", "Utah Jazz", 1610612762, "West", "Northwest", ("UTAH", "New Orleans Jazz")),
+    (30, "WAS", "Washington Wizards", 1610612764, "East", "Southeast", ("WSH", "Washington Bullets",
+                                                                       "Capital Bullets", "Baltimore Bullets")),
+]
+
+TEAM_KEY = "TEAM_KEY"
+KEY_COLUMNS = (TEAM_KEY, "CHAMP_KEY", "RUNNER_UP_KEY")
+
+# Categorical over the 30 keys: codes are int8, unknown teams are NaN
+KEY_DTYPE = pd.CategoricalDtype(categories=[t[0] for t in TEAMS])
+
+ABBREVIATION = {t[0]: t[1] for t in TEAMS}
+NAME = {t[0]: t[2] for t in TEAMS}
+NBA_TEAM_ID = {t[0]: t[3] for t in TEAMS}
+
+ALIASES = {}
+for _key, _tm, _name, _id, _conf, _div, _others in TEAMS:
+    for _alias in (_tm, _name, *_others):
+        ALIASES[_alias] = _key
+
+
+def team_dimension() -> pd.DataFrame:
+    """The dimension as a frame (exported as data/df_nba_teams)."""
+    df = pd.DataFrame(
+        [t[:6] for t in TEAMS],
+        columns=[TEAM_KEY, "TM", "TEAM", "NBA_TEAM_ID", "CONF", "DIV"]
+    )
+    df[TEAM_KEY] = df[TEAM_KEY].astype(KEY_DTYPE)
+    return df
+
+
+# -------------------------------
+# Lookups
+# -------------------------------
+def key(alias) -> int | None:
+    """Key for one abbreviation or name (any known spelling)."""
+    return ALIASES.get(str(alias).strip())
+
+
+def to_key(values: pd.Series) -> pd.Series:
+    """Vectorized alias -> categorical TEAM_KEY (NaN when the spelling is unknown)."""
+    return values.astype(str).str.strip().map(ALIASES).astype(KEY_DTYPE)
+
+
+def abbreviations(keys: pd.Series, unknown: str = "Unknown") -> pd.Series:
+    """Canonical abbreviation for each key."""
+    return keys.map(ABBREVIATION).astype(object).fillna(unknown)
+
+
+def names(keys: pd.Series, unknown: str = "Unknown") -> pd.Series:
+    """Full team name for each key."""
+    return keys.map(NAME).astype(object).fillna(unknown)
+
+
+def categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Restore the categorical dtype of key columns (e.g. after an Excel round trip)."""
+    for col in KEY_COLUMNS:
+        if col in df.columns and df[col].dtype != KEY_DTYPE:
+            df[col] = df[col].astype("Int64").astype(KEY_DTYPE)
+    return df
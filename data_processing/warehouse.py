@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Embedded DuckDB analytics store: nba.duckdb in each published generation.
+
+Built by the pipeline's ``publish`` stage from the same frames as the
+Parquet dataset (and published with it, see generations.py), so pages can
+push filters, sorts and aggregations down to DuckDB instead of loading whole
+tables into every session:
+
+    players        filtered player stats, one row per player x team x season type
+                   (SEASON, SEASON_TYPE = 'Regular Season' / 'Playoffs')
+    salaries       contracts as published (one column per season)
+    contracts      the same contracts parsed at ingest (BIGINT per season, see contracts.py)
+    salaries_long  view: one row per player x team x season, SALARY_NUM as BIGINT
+    standings      both conferences with CONF ('Ouest' / 'Est') and RANK
+    ratings        regular-season team ratings
+    champions      finals history (RUNNER = RUNNER-UP)
+    teams          the team dimension
+
+TEAM_KEY columns are TINYINT. A published store is never rewritten: a
+refresh builds a new one in the next generation.
+"""
+
+import os
+
+import duckdb
+import pandas as pd
+
+from data_processing import contracts, generations, teams
+
+DB_FILE = "nba.duckdb"
+
+SEASON_TYPES = {
+    "reg_season_players_filtered": "Regular Season",
+    "playoff_players_filtered": "Playoffs",
+}
+
+
+# -------------------------------
+# Build
+# -------------------------------
+def _storable(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy(deep=False)
+    for col in teams.KEY_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("Int8")
+    return out
+
+
+def build_tables(frames: dict[str, pd.DataFrame], season: str) -> dict[str, pd.DataFrame]:
+    """Warehouse tables from the pipeline artifacts."""
+    players = pd.concat(
+        [frames[name].assign(SEASON=season, SEASON_TYPE=season_type)
+         for name, season_type in SEASON_TYPES.items()],
+        ignore_index=True
+    )
+    west = frames["western_conf_standing"].assign(CONF="Ouest")
+    east = frames["eastern_conf_standing"].assign(CONF="Est")
+    west["RANK"] = range(1, len(west) + 1)
+    east["RANK"] = range(1, len(east) + 1)
+    return {
+        "players": players,
+        "salaries": frames["nba_players_salaries"],
+        "contracts": frames["contracts"],
+        "standings": pd.concat([east, west], ignore_index=True),
+        "ratings": frames["nba_team_reg_season_ratings"],
+        "champions": frames["nba_champion"].assign(RUNNER=frames["nba_champion"]["RUNNER-UP"]),
+        "teams": frames["nba_teams"],
+    }
+
+
+def build(frames: dict[str, pd.DataFrame], season: str, path: str) -> str:
+    """Write every table (and the salaries_long view) to a fresh DuckDB file."""
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = duckdb.connect(tmp)
+    try:
+        for name, df in build_tables(frames, season).items():
+            con.register("frame", _storable(df))
+            con.execute(f'CREATE TABLE "{name}" AS SELECT * FROM frame')
+            con.unregister("frame")
+        seasons = ", ".join(f'"{s}"' for s in contracts.SEASONS)
+        con.execute(f"""
+            CREATE VIEW salaries_long AS
+            SELECT TEAM_KEY, PLAYER, TEAM, TM, YEAR, SALARY_NUM
+            FROM (SELECT TEAM_KEY, PLAYER, TEAM, TM, {seasons} FROM contracts)
+            UNPIVOT (SALARY_NUM FOR YEAR IN ({seasons}))
+        """)
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    return path
+
+
+# -------------------------------
+# Query
+# -------------------------------
+def connect(generation: str | None = None) -> duckdb.DuckDBPyConnection:
+    """Read-only connection to the store of ``generation`` (default: the current one);
+    share it per process and query through ``query``."""
+    directory = generations.path(generation) if generation else generations.current_dir()
+    return duckdb.connect(os.path.join(directory, DB_FILE), read_only=True)
+
+
+def query(con: duckdb.DuckDBPyConnection, sql: str, params: list | dict | None = None) -> pd.DataFrame:
+    """Run one query on its own cursor (safe across Streamlit sessions / threads).
+
+    ``params`` binds ``?`` placeholders (list) or ``$name`` ones (dict).
+    """
+    with con.cursor() as cur:
+        df = cur.execute(sql, params or []).df()
+    return teams.categorize(df)
+
+
+def ident(name: str) -> str:
+    """Quote a column name picked from a whitelist (stats, seasons) for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
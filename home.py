@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
-import pandas as pd
+from core import data, leaderboards, warmup
+from data_processing import teams
 
 # -------------------------------
 # Configuration de la Page
@@ -18,26 +19,9 @@ with c2: st.page_link("pages/1_Team.py",           label=" Équipe") # Lien vers
 with c3: st.page_link("pages/2_Statistics.py",     label=" Statistiques") # Lien vers la page de statistiques
 with c4: st.page_link("pages/3_Champ_Historic.py", label=" Historique") # Lien vers la page historique des champions
 with c5: st.page_link("pages/4_Trade_Machine.py",  label=" Machine à Trade") # Lien vers la machine à trade
+warmup.show_status()  # préchargement des caches en arrière-plan (core.warmup)
 
 
-# -------------------------------
-# Chargement des Données (cache) => But : éviter de relire 5 Excel à chaque interaction.
-# -------------------------------
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_data():
-    df_west  = pd.read_excel("data/df_western_conf_standing.xlsx")
-    df_east  = pd.read_excel("data/df_eastern_conf_standing.xlsx")
-    df_team_ratings = pd.read_excel("data/df_nba_team_reg_season_ratings.xlsx")
-    df_players = pd.read_excel("data/df_reg_season_players_filtered.xlsx")
-    df_salaries = pd.read_excel("data/df_nba_players_salaries.xlsx")
-    return df_west, df_east, df_team_ratings, df_players, df_salaries
-
-with st.spinner("Chargement des données..."):
-    df_west, df_east, df_team_ratings, df_players, df_salaries = load_data()
-
-# ton filtrage existant
-df_players = df_players[(df_players["GP"] > 10) & (df_players["MIN_PG"] > 10)]
-
 # -------------------------------
 # Titre de la Page
 # -------------------------------
@@ -51,39 +35,37 @@ st.markdown(
 )
 
 
-# -------------------------------
-# Onglets de Navigation
-# -------------------------------
-# Crée des onglets pour organiser le contenu de la page
-tab1, tab2, tab3, tab4 = st.tabs([
-    " Classements des Conférences",
-    " Meilleurs Joueurs",
-    " Évaluations des Équipes",
-    " Salaires"
-])
-
 # -------------------------------
 # Contenu de l'Onglet 1 : Classements des Conférences
 # -------------------------------
-with tab1:
+# Chaque onglet est un fragment (un widget de l'onglet ne relance que son fragment) et
+# lit uniquement les tables dont il a besoin (couche partagée, une lecture par processus)
+@st.fragment
+def onglet_classements():
     st.markdown("##  Classements des Conférences") # Titre de l'onglet
+    df_west = data.table("western_conf_standing")
+    df_east = data.table("eastern_conf_standing")
 
     col1, col2 = st.columns(2) # Crée deux colonnes pour afficher les conférences côte à côte
     with col1:
         st.markdown("### Conférence Ouest") # Sous-titre pour la Conférence Ouest
-        st.dataframe(df_west, hide_index=True, use_container_width=True) # Affiche le DataFrame de la Conférence Ouest
+        st.dataframe(data.affichage(df_west), hide_index=True, use_container_width=True) # Affiche le DataFrame de la Conférence Ouest
     with col2:
         st.markdown("### Conférence Est") # Sous-titre pour la Conférence Est
-        st.dataframe(df_east, hide_index=True, use_container_width=True) # Affiche le DataFrame de la Conférence Est
+        st.dataframe(data.affichage(df_east), hide_index=True, use_container_width=True) # Affiche le DataFrame de la Conférence Est
 
 # -------------------------------
 # Contenu de l'Onglet 2 : Meilleurs Joueurs
 # -------------------------------
-with tab2:
+@st.fragment
+def onglet_meilleurs_joueurs():
     st.markdown("##  Top 3 des Joueurs par Métriques Clés") # Titre de l'onglet
 
+    # Index de classements précalculé (joueurs avec GP > 10 & MIN_PG > 10)
+    board = leaderboards.board("Regular Season", min_gp=11)
+
     # Filtre de sélection d'équipe unique avec l'option "Toutes les équipes"
-    all_teams = sorted(df_players["TEAM"].dropna().unique()) # Récupère la liste unique des équipes
+    all_teams = sorted(board.rows["TEAM"].dropna().unique()) # Récupère la liste unique des équipes
     team_choice = st.selectbox(
         "Équipe",
         options=["Toutes les équipes"] + all_teams, # Ajoute "Toutes les équipes" comme première option
@@ -91,10 +73,7 @@ with tab2:
         key="top_players_team_filter_single" # Clé unique pour le widget
     )
 
-    # Applique le filtre localement
-    df_tp = df_players.copy() # Crée une copie du DataFrame des joueurs
-    if team_choice != "Toutes les équipes": # Si une équipe spécifique est choisie
-        df_tp = df_tp[df_tp["TEAM"] == team_choice] # Filtre le DataFrame par l'équipe sélectionnée
+    team_key = None if team_choice == "Toutes les équipes" else teams.key(team_choice) # Clé de l'équipe choisie
 
     metrics = {
         "Points Par Match": "PTS_PG",
@@ -105,19 +84,17 @@ with tab2:
     # Itère sur chaque métrique pour afficher les 3 meilleurs joueurs
     for label, col_name in metrics.items():
 
-        top3 = (
-            df_tp[["PLAYER_NAME", "TEAM", col_name]] # Sélectionne les colonnes Joueur, Équipe et la métrique
-            .sort_values(by=col_name, ascending=False) # Trie par la métrique en ordre décroissant
-            .head(3) # Prend les 3 premiers joueurs
-        )
+        top3 = board.top(col_name, 3, team=team_key)[["PLAYER_NAME", "TEAM", col_name]] # Les 3 premiers, déjà triés
         st.markdown(f"### {label}") # Affiche le titre de la métrique
         st.dataframe(top3, hide_index=True, use_container_width=True) # Affiche le DataFrame des 3 meilleurs
 
 # -------------------------------
 # Contenu de l'Onglet 3 : Évaluations des Équipes
 # -------------------------------
-with tab3:
+@st.fragment
+def onglet_evaluations():
     st.markdown("##  Évaluations de Performance des Équipes (Top 10)") # Titre de l'onglet
+    df_team_ratings = data.table("nba_team_reg_season_ratings")
 
     col1, col2, col3 = st.columns(3) # Crée trois colonnes pour les différentes évaluations
 
@@ -144,8 +121,10 @@ with tab3:
 # -------------------------------
 # Contenu de l'Onglet 4 : Salaires (team -> joueurs)
 # -------------------------------
-with tab4:
+@st.fragment
+def onglet_salaires():
     st.markdown("## Salaires")
+    df_salaries = data.table("nba_players_salaries")
 
     TEAM_ALL, PLAYER_ALL = "Toutes les équipes", "Tous les joueurs"
 
@@ -177,4 +156,25 @@ with tab4:
     if df_filtered.empty:
         st.info("Aucun résultat pour ces filtres.")
     else:
-        st.dataframe(df_filtered, hide_index=True, use_container_width=True)
+        st.dataframe(data.affichage(df_filtered), hide_index=True, use_container_width=True)
+
+
+# -------------------------------
+# Onglets de Navigation
+# -------------------------------
+# Seul l'onglet actif est calculé et affiché (st.tabs exécute les quatre à chaque rerun)
+ONGLETS = {
+    "Classements des Conférences": onglet_classements,
+    "Meilleurs Joueurs": onglet_meilleurs_joueurs,
+    "Évaluations des Équipes": onglet_evaluations,
+    "Salaires": onglet_salaires,
+}
+onglet = st.radio(
+    "Onglet",
+    list(ONGLETS),
+    index=0, # Premier onglet par défaut
+    horizontal=True,
+    key="home_tab",
+    label_visibility="collapsed"
+)
+ONGLETS[onglet]() # Affiche uniquement l'onglet choisi
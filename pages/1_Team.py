@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from core import data, figures, leaderboards, warmup
+from data_processing import teams
 
 # -------------------------------
 # Configuration de la Page
@@ -17,65 +18,85 @@ with c2: st.page_link("pages/1_Team.py",           label=" Équipe")
 with c3: st.page_link("pages/2_Statistics.py",     label=" Statistiques")
 with c4: st.page_link("pages/3_Champ_Historic.py", label=" Historique")
 with c5: st.page_link("pages/4_Trade_Machine.py",  label=" Machine à Trade")
+warmup.show_status()  # préchargement des caches en arrière-plan (core.warmup)
 
 # =========================================================
 # CACHES
 # =========================================================
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_team_page_data():
-    df_west         = pd.read_excel("data/df_western_conf_standing.xlsx")
-    df_east         = pd.read_excel("data/df_eastern_conf_standing.xlsx")
-    df_team_ratings = pd.read_excel("data/df_nba_team_reg_season_ratings.xlsx")
-    df_reg_players  = pd.read_excel("data/df_reg_season_players_filtered.xlsx")
-    df_po_players   = pd.read_excel("data/df_playoff_players_filtered.xlsx")
-    df_salaries     = pd.read_excel("data/df_nba_players_salaries.xlsx")
-    return df_west, df_east, df_team_ratings, df_reg_players, df_po_players, df_salaries
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def build_salaries_long_join(df_salaries: pd.DataFrame, df_reg_players: pd.DataFrame):
-    # Colonnes d'années dynamiques (exclut PLAYER/TEAM/GUARANTEED)
-    year_cols = [c for c in df_salaries.columns if c not in ["PLAYER", "TEAM"] and str(c).upper() != "GUARANTEED"]
-
-    df_salaries_long = df_salaries.melt(
-        id_vars=["PLAYER", "TEAM"],
-        value_vars=year_cols,
-        var_name="YEAR",
-        value_name="SALARY"
+def requete(sql: str, params: list | None = None) -> pd.DataFrame:
+    # Connexion DuckDB partagée par les sessions (core.data)
+    return data.query(sql, params)
+
+# Filtre qualité par partie de saison (cohérent avec la home) : poussé dans la requête SQL,
+# et GP minimum de l'index de classements utilisé par les KPIs
+SEASON_TYPES = {
+    "Saison Régulière": ("Regular Season", "GP > 10 AND MIN_PG > 10", 11),
+    "Playoffs":         ("Playoffs",       "GP >= 4 AND MIN_PG > 10", 4),
+}
+
+def load_roster(season_filter: str, team_key: int) -> pd.DataFrame:
+    """Effectif d'une équipe (filtre qualité appliqué dans DuckDB)."""
+    season_type, quality, _ = SEASON_TYPES[season_filter]
+    return requete(
+        f"""SELECT * EXCLUDE (SEASON, SEASON_TYPE) FROM players
+            WHERE SEASON_TYPE = ? AND TEAM_KEY = ? AND {quality}""",
+        [season_type, team_key]
     )
 
-    # Jointure pour récupérer position et stats clés (depuis REG saison)
-    df_players_slim = df_reg_players[["PLAYER_NAME", "TEAM", "POSITION", "PTS_PG", "AST_PG", "REB_PG"]].rename(
-        columns={"PLAYER_NAME": "PLAYER"}
+def load_team_salaries(team_key: int, year: str) -> pd.DataFrame:
+    """Salaires d'une équipe pour une saison, avec position et stats clés (saison régulière)."""
+    return requete(
+        f"""SELECT s.PLAYER, s.TEAM, s.YEAR, s.SALARY_NUM,
+                   p.POSITION, p.PTS_PG, p.AST_PG, p.REB_PG
+            FROM salaries_long s
+            LEFT JOIN players p
+              ON p.PLAYER_NAME = s.PLAYER AND p.TEAM_KEY = s.TEAM_KEY
+             AND p.SEASON_TYPE = 'Regular Season' AND {SEASON_TYPES["Saison Régulière"][1]}
+            WHERE s.TEAM_KEY = ? AND s.YEAR = ?""",
+        [team_key, year]
     )
 
-    df_join = pd.merge(
-        df_salaries_long,
-        df_players_slim,
-        how="left",
-        on=["PLAYER", "TEAM"]
+def graphique_salaires_position(team_key: int, year: str, _salaires: pd.DataFrame):
+    """Camembert des salaires par position (None si rien à tracer) ; mis en cache par figures.
+    ``_salaires`` : lignes de l'équipe et de la saison déjà chargées par la page, avec position."""
+    df_pie = (
+        _salaires.groupby("POSITION", as_index=False)["SALARY_NUM"]
+        .sum()
+        .sort_values("SALARY_NUM", ascending=False)
     )
+    if df_pie.empty or df_pie["SALARY_NUM"].sum() == 0:
+        return None
+
+    import plotly.express as px  # chargé seulement quand le graphique est construit
 
-    # SALARY_NUM numérique
-    df_join["SALARY_NUM"] = (
-        df_join["SALARY"]
-        .astype(str)
-        .str.replace(r"[^0-9]", "", regex=True)
-        .replace("", "0")
-        .astype(int)
+    fig = px.pie(
+        df_pie,
+        names="POSITION",
+        values="SALARY_NUM",
+        title=f"Total des Salaires par Position — {teams.NAME[team_key]} ({year})",
+        hole=0.35,
+        color_discrete_sequence=px.colors.sequential.Blues_r
     )
-    return df_salaries_long, df_join
+    fig.update_traces(
+        textposition="inside",
+        texttemplate="%{label}<br>$%{value:,.0f} (%{percent:.1%})",
+        hovertemplate="%{label}<br>Total: $%{value:,.0f}<br>%{percent}",
+        sort=False
+    )
+    fig.update_layout(margin=dict(t=60, b=30, l=10, r=10))
+    return fig
 
 # =========================================================
 # UTILITAIRES UI
 # =========================================================
-def render_kpi(df: pd.DataFrame, value_col: str, title: str):
-    """Affiche une carte KPI pour le joueur ayant la valeur max de value_col."""
-    if df.empty or value_col not in df.columns or df[value_col].dropna().empty:
+def render_kpi(board: leaderboards.Board, value_col: str, title: str, team_key: int):
+    """Affiche une carte KPI pour le joueur de l'équipe ayant la valeur max de value_col
+    (lue dans l'index de classements, sans tri)."""
+    row = board.best(value_col, team_key) if value_col in board.order else None
+    if row is None or pd.isna(row[value_col]):
         st.info(f"Aucune donnée pour {title}.")
         return
 
-    idx = df[value_col].idxmax()
-    row = df.loc[idx]
     val = float(row[value_col])
     player_name = str(row.get("PLAYER_NAME", "Inconnu"))
 
@@ -108,7 +129,7 @@ def render_kpi_box(title: str, value_text: str, subtitle: str = ""):
 def pick_display_columns(
     df: pd.DataFrame,
     base_cols=("TEAM", "PLAYER_NAME", "PTS_PG", "AST_PG", "REB_PG", "MIN_PG"),
-    exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION"),
+    exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION", "TEAM_KEY"),
     key="col_picker"
 ) -> list:
     """Sélecteur de colonnes avec exclusions et option 'Tout sélectionner'."""
@@ -128,18 +149,6 @@ def pick_display_columns(
         selected_extra = extras
     return defaults + selected_extra
 
-# =========================================================
-# CHARGEMENT DES DONNÉES
-# =========================================================
-df_west, df_east, df_team_ratings, df_reg_players, df_po_players, df_salaries = load_team_page_data()
-
-# Filtre qualité (cohérent avec ta home) : GP>10 & MIN_PG>10
-df_reg_players = df_reg_players[(df_reg_players["GP"] > 10) & (df_reg_players["MIN_PG"] > 10)]
-df_po_players  = df_po_players[(df_po_players["GP"] >= 4) & (df_po_players["MIN_PG"] > 10)]
-
-# Build salaires long + join (caché)
-df_salaries_unpivoted, df_join = build_salaries_long_join(df_salaries, df_reg_players)
-
 # =========================================================
 # TITRE
 # =========================================================
@@ -148,31 +157,19 @@ st.markdown("<h1 style='text-align: center;'> Aperçu de l'Équipe NBA 2024-25</
 # =========================================================
 # FILTRE GLOBAL ÉQUIPE
 # =========================================================
-team_options = sorted(df_reg_players["TEAM"].dropna().unique())
-selected_team = st.selectbox("Sélectionnez une Équipe", team_options, index=0, key="team_filter")
+team_options = sorted(
+    requete(f"SELECT DISTINCT TEAM_KEY FROM players WHERE SEASON_TYPE = 'Regular Season' AND "
+            f"{SEASON_TYPES['Saison Régulière'][1]}")["TEAM_KEY"].dropna(),
+    key=teams.NAME.get
+)
+selected_key = st.selectbox("Sélectionnez une Équipe", team_options, index=0,
+                            format_func=teams.NAME.get, key="team_filter")
+selected_team = teams.NAME[selected_key]
 
 # =========================================================
 # STANDINGS (conf + rang)
 # =========================================================
-df_west_local = df_west.copy()
-df_east_local = df_east.copy()
-df_west_local["CONF"] = "Ouest"
-df_east_local["CONF"] = "Est"
-df_west_local["RANK"] = range(1, len(df_west_local) + 1)
-df_east_local["RANK"] = range(1, len(df_east_local) + 1)
-df_standings = pd.concat([df_east_local, df_west_local], ignore_index=True)
-
-def to_bool_playoff(x):
-    s = str(x).strip().lower()
-    return s in ("*", "true", "1")
-
-if "PLAYOFF_TEAM" in df_standings.columns:
-    if df_standings["PLAYOFF_TEAM"].dtype != bool:
-        df_standings["PLAYOFF_TEAM"] = df_standings["PLAYOFF_TEAM"].apply(to_bool_playoff)
-else:
-    df_standings["PLAYOFF_TEAM"] = False
-
-team_row = df_standings[df_standings["TEAM"] == selected_team]
+team_row = requete("SELECT CONF, RANK, PLAYOFF_TEAM FROM standings WHERE TEAM_KEY = ?", [selected_key])
 if not team_row.empty:
     conf = team_row.iloc[0]["CONF"]
     rank = int(team_row.iloc[0]["RANK"])
@@ -190,12 +187,11 @@ season_filter = st.radio(
     key="season_filter_team"
 )
 
-df_current = df_reg_players if season_filter == "Saison Régulière" else df_po_players
-df_current = df_current[df_current["TEAM"] == selected_team]
+df_current = load_roster(season_filter, selected_key)
+board = leaderboards.board(SEASON_TYPES[season_filter][0], min_gp=SEASON_TYPES[season_filter][2])
 
 if season_filter == "Playoffs":
-    row = df_standings[df_standings["TEAM"] == selected_team]
-    is_po = bool(row["PLAYOFF_TEAM"].iloc[0]) if not row.empty else False
+    is_po = bool(team_row["PLAYOFF_TEAM"].iloc[0]) if not team_row.empty else False
     if not is_po:
         st.warning(f"{selected_team} n'a pas participé aux playoffs en 2024-25 — aucune statistique de joueur de playoffs à afficher.")
         st.stop()
@@ -214,17 +210,17 @@ tab_stats, tab_salaries = st.tabs([" Statistiques de l'Équipe", " Salaires"])
 with tab_stats:
     # KPIs 1
     c1, c2, c3 = st.columns(3)
-    with c1: render_kpi(df_current, "PTS_PG", "Points par Match")
-    with c2: render_kpi(df_current, "REB_PG", "Rebonds par Match")
-    with c3: render_kpi(df_current, "AST_PG", "Passes Décisives par Match")
+    with c1: render_kpi(board, "PTS_PG", "Points par Match", selected_key)
+    with c2: render_kpi(board, "REB_PG", "Rebonds par Match", selected_key)
+    with c3: render_kpi(board, "AST_PG", "Passes Décisives par Match", selected_key)
 
     st.markdown("<br>", unsafe_allow_html=True)
 
     # KPIs 2
     c4, c5, c6 = st.columns(3)
-    with c4: render_kpi(df_current, "STL_PG", "Interceptions par Match")
-    with c5: render_kpi(df_current, "BLK_PG", "Contres par Match")
-    with c6: render_kpi(df_current, "TOV_PG", "Pertes de Balle par Match")
+    with c4: render_kpi(board, "STL_PG", "Interceptions par Match", selected_key)
+    with c5: render_kpi(board, "BLK_PG", "Contres par Match", selected_key)
+    with c6: render_kpi(board, "TOV_PG", "Pertes de Balle par Match", selected_key)
 
     st.markdown("<br><br><br>", unsafe_allow_html=True)
 
@@ -233,7 +229,7 @@ with tab_stats:
     cols_to_show = pick_display_columns(
         df_current,
         base_cols=("TEAM", "PLAYER_NAME", "PTS_PG", "AST_PG", "REB_PG", "MIN_PG"),
-        exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION"),
+        exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION", "TEAM_KEY"),
         key="team_full_fields"
     )
     if cols_to_show:
@@ -248,10 +244,11 @@ with tab_salaries:
     st.markdown(f"### Salaires des Joueurs — {selected_team}")
 
     # Liste d'années disponibles (hors 'GUARANTEED' déjà exclu en amont)
-    all_years = sorted(df_salaries_unpivoted["YEAR"].dropna().unique())
+    all_years = requete("SELECT DISTINCT YEAR FROM salaries_long ORDER BY YEAR")["YEAR"].tolist()
     selected_year = st.selectbox("Sélectionnez la Saison", all_years, index=0, key="salary_year")
 
-    df_team_year = df_join[(df_join["TEAM"] == selected_team) & (df_join["YEAR"] == selected_year)].copy()
+    df_team_year = load_team_salaries(selected_key, selected_year)
+    df_positions = df_team_year[df_team_year["POSITION"].notna()]  # <-- exclut les joueurs sans position (camembert, détail)
 
     # KPIs salaires
     team_total = int(df_team_year["SALARY_NUM"].sum()) if not df_team_year.empty else 0
@@ -282,33 +279,13 @@ with tab_salaries:
     with c2: render_kpi_box("Joueur le Mieux Payé", f"${top_salary:,.0f}", top_player)
     with c3: render_kpi_box("Meilleure valeur (PTS+AST+REB / 1 M$)", f"{best_value_score:.1f}", best_value_player)
     
-    # Pie salaires par position
-    df_team_year = df_team_year[df_team_year["POSITION"].notna()]  # <-- exclut les joueurs sans position
-    df_pie = (
-        df_team_year.groupby("POSITION", as_index=False)["SALARY_NUM"]
-        .sum()
-        .sort_values("SALARY_NUM", ascending=False)
-    )
+    # Pie salaires par position (figure en cache par version, équipe et saison)
+    fig = figures.figure("salaires_par_position", graphique_salaires_position,
+                         team_key=selected_key, year=selected_year, _salaires=df_positions)
 
-
-    if df_pie.empty or df_pie["SALARY_NUM"].sum() == 0:
+    if fig is None:
         st.info("Aucune donnée de salaire disponible pour cette équipe/année.")
     else:
-        fig = px.pie(
-            df_pie,
-            names="POSITION",
-            values="SALARY_NUM",
-            title=f"Total des Salaires par Position — {selected_team} ({selected_year})",
-            hole=0.35,
-            color_discrete_sequence=px.colors.sequential.Blues_r
-        )
-        fig.update_traces(
-            textposition="inside",
-            texttemplate="%{label}<br>$%{value:,.0f} (%{percent:.1%})",
-            hovertemplate="%{label}<br>Total: $%{value:,.0f}<br>%{percent}",
-            sort=False
-        )
-        fig.update_layout(margin=dict(t=60, b=30, l=10, r=10))
         st.plotly_chart(fig, use_container_width=True)
 
         with st.expander("Afficher les lignes de joueurs pour cette saison"):
@@ -316,7 +293,7 @@ with tab_salaries:
             try:
                 money_col = st.column_config.NumberColumn(format="$%,.0f")
                 st.dataframe(
-                    df_team_year[["PLAYER", "POSITION", "SALARY_NUM"]].rename(columns={"SALARY_NUM": "SALARY($)"}),
+                    df_positions[["PLAYER", "POSITION", "SALARY_NUM"]].rename(columns={"SALARY_NUM": "SALARY($)"}),
                     column_config={"SALARY($)": money_col},
                     hide_index=True,
                     use_container_width=True
@@ -324,7 +301,7 @@ with tab_salaries:
             except Exception:
                 # fallback si la version de Streamlit ne supporte pas column_config
                 st.dataframe(
-                    df_team_year[["PLAYER", "POSITION", "SALARY_NUM"]].rename(columns={"SALARY_NUM": "SALARY($)"}),
+                    df_positions[["PLAYER", "POSITION", "SALARY_NUM"]].rename(columns={"SALARY_NUM": "SALARY($)"}),
                     hide_index=True,
                     use_container_width=True
                 )
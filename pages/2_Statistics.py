@@ -1,6 +1,6 @@
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+from core import figures, leaderboards, warmup
 
 # Lancer avec : py -m streamlit run test.py
 st.set_page_config(layout="wide")
@@ -14,11 +14,17 @@ with c2: st.page_link("pages/1_Team.py",           label=" Équipe")
 with c3: st.page_link("pages/2_Statistics.py",     label=" Statistiques")
 with c4: st.page_link("pages/3_Champ_Historic.py", label=" Historique")
 with c5: st.page_link("pages/4_Trade_Machine.py",  label=" Simulateur de Trade")
+warmup.show_status()  # préchargement des caches en arrière-plan (core.warmup)
 
 
-# Charger les données
-df_reg_season_players = pd.read_excel("data/df_reg_season_players_filtered.xlsx")
-df_playoff_players = pd.read_excel("data/df_playoff_players_filtered.xlsx")
+# -------------------------------
+# Index de classements (précalculé une fois par version des données)
+# -------------------------------
+SEASON_TYPES = {
+    "Saison régulière": "Regular Season",
+    "Playoffs": "Playoffs",
+}
+MODE_SUFFIX = {"Par match": "_PG", "Total": ""}
 
 # -------------------------------
 # Titre principal
@@ -75,15 +81,18 @@ else:
 # -------------------------------
 # Sélection du dataset
 # -------------------------------
-df = df_reg_season_players if season_filter == "Saison régulière" else df_playoff_players
-df = df[(df["GP"] > 10) & (df["MIN_PG"] > 10)]
+# Joueurs filtrés (GP > 10 & MIN_PG > 10) et leurs ordres de tri par stat
+board = leaderboards.board(SEASON_TYPES[season_filter], min_gp=11)
+df = board.rows   # toutes les colonnes (vue "Toutes les données")
 
 # -------------------------------
-# Utilitaire : graphique en barres
+# Utilitaire : graphique en barres (mis en cache par figures : version, saison, stat)
 # -------------------------------
-def graphique_barres(data, col_name, titre):
-    
-    # Renommer la colonne avant de trier
+def graphique_barres(season_type, col_name, titre):
+    import plotly.express as px  # chargé seulement en mode "Diagramme en barres"
+
+    # Top 5 lu dans l'index de classements, puis renommer la colonne avant de trier
+    data = leaderboards.board(season_type, min_gp=11).top(col_name, 5)[["PLAYER_NAME", "TEAM", col_name]]
     data = data.rename(columns={"PLAYER_NAME": "PLAYER"})
     data_sorted = data.sort_values(by=col_name, ascending=False)
 
@@ -119,7 +128,7 @@ def graphique_barres(data, col_name, titre):
 # -------------------------------
 # Fonctions d'affichage
 # -------------------------------
-def afficher_offensif(df, label, mode, view_mode):
+def afficher_offensif(board, label, mode, view_mode):
     suffix = "_PG" if mode == "Par match" else ""
     st.markdown(f"##  Statistiques offensives ({label} - {mode})")
 
@@ -132,15 +141,16 @@ def afficher_offensif(df, label, mode, view_mode):
 
     col1, col2 = st.columns(2)
     for (titre, col_name), col in zip(stats.items(), [col1, col2, col1, col2]):
-        top_data = df[["PLAYER_NAME", "TEAM", col_name + suffix]].sort_values(by=col_name + suffix, ascending=False).head(5)
         if view_mode == "Tableau":
+            top_data = board.top(col_name + suffix, 5)[["PLAYER_NAME", "TEAM", col_name + suffix]]
             col.markdown(f"### {titre} {mode}")
             col.dataframe(top_data, hide_index=True, use_container_width=True)
         else:
-            fig = graphique_barres(top_data, col_name + suffix, f"{titre}")
+            fig = figures.figure("stats_leaders", graphique_barres,
+                                 season_type=SEASON_TYPES[label], col_name=col_name + suffix, titre=titre)
             col.plotly_chart(fig, use_container_width=True)
 
-def afficher_defensif(df, label, mode, view_mode):
+def afficher_defensif(board, label, mode, view_mode):
     suffix = "_PG" if mode == "Par match" else ""
     st.markdown(f"##  Statistiques défensives ({label} - {mode})")
 
@@ -153,12 +163,13 @@ def afficher_defensif(df, label, mode, view_mode):
 
     col1, col2 = st.columns(2)
     for (titre, col_name), col in zip(stats.items(), [col1, col2, col1, col2]):
-        top_data = df[["PLAYER_NAME", "TEAM", col_name + suffix]].sort_values(by=col_name + suffix, ascending=False).head(5)
         if view_mode == "Tableau":
+            top_data = board.top(col_name + suffix, 5)[["PLAYER_NAME", "TEAM", col_name + suffix]]
             col.markdown(f"### {titre} {mode}")
             col.dataframe(top_data, hide_index=True, use_container_width=True)
         else:
-            fig = graphique_barres(top_data, col_name + suffix, f"{titre}")
+            fig = figures.figure("stats_leaders", graphique_barres,
+                                 season_type=SEASON_TYPES[label], col_name=col_name + suffix, titre=titre)
             col.plotly_chart(fig, use_container_width=True)
             
 
@@ -170,7 +181,7 @@ def afficher_defensif(df, label, mode, view_mode):
 def pick_display_columns(
     df: pd.DataFrame,
     base_cols=("TEAM", "PLAYER_NAME", "PTS_PG", "AST_PG", "REB_PG", "MIN_PG"),
-    exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION"),
+    exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION", "TEAM_KEY"),
     key="col_picker"
 ) -> list:
     """Sélecteur de colonnes avec exclusions et option 'Tout sélectionner'."""
@@ -194,9 +205,9 @@ def pick_display_columns(
 # Affichage selon les filtres
 # -------------------------------
 if metric_filter == "Leaders":
-    afficher_offensif(df, season_filter, stat_mode, view_mode)
+    afficher_offensif(board, season_filter, stat_mode, view_mode)
     st.divider()
-    afficher_defensif(df, season_filter, stat_mode, view_mode)
+    afficher_defensif(board, season_filter, stat_mode, view_mode)
 
 elif metric_filter == "Top 30":
     stat_choice = st.selectbox(
@@ -215,7 +226,7 @@ elif metric_filter == "Top 30":
             "Ballons perdus",
         ]
     )
-    suffix = "_PG" if stat_mode == "Par match" else ""
+    suffix = MODE_SUFFIX[stat_mode]
     stat_map = {
         "Points": "PTS",
         "Passes décisives": "AST",
@@ -231,11 +242,8 @@ elif metric_filter == "Top 30":
     }
 
     chosen_col = stat_map[stat_choice] + suffix
-    top30 = (
-        df[["PLAYER_NAME", "TEAM", chosen_col]]
-        .sort_values(by=chosen_col, ascending=False)
-        .head(30)
-    )
+    # Tranche de l'ordre précalculé : pas de tri à chaque rerun
+    top30 = board.top(chosen_col, 30)[["PLAYER_NAME", "TEAM", chosen_col]]
 
     st.markdown(f"##  Top 30 {stat_choice} ({stat_mode}) - {season_filter}")
     st.dataframe(top30, hide_index=True, use_container_width=True)
@@ -246,7 +254,7 @@ elif metric_filter == "Toutes les données":
     cols_to_show = pick_display_columns(
         df,
         base_cols=("TEAM", "PLAYER_NAME", "PTS_PG", "AST_PG", "REB_PG", "MIN_PG"),
-        exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION"),
+        exclude=("PLAYER_ID", "NICKNAME", "TEAM_ABBREVIATION", "TEAM_KEY"),
         key="all_data_fields"
     )
 
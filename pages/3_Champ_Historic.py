@@ -1,7 +1,7 @@
 import unicodedata
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+from core import data, figures, warmup
 
 # --------------------------------------------------
 # Lancer avec :  streamlit run 3_Champ_Historic.py
@@ -22,13 +22,13 @@ with c4:
     st.page_link("pages/3_Champ_Historic.py", label=" Historique")
 with c5:
     st.page_link("pages/4_Trade_Machine.py",  label=" Simulateur de Trade")
+warmup.show_status()  # préchargement des caches en arrière-plan (core.warmup)
 
 # -------------------------------
 # Chargement des données
 # -------------------------------
-@st.cache_data(show_spinner=False)
-def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_excel(path)
+def load_data(name: str) -> pd.DataFrame:
+    df = data.table(name)  # vue sur la table partagée (copy-on-write)
     # Normalisation minimale des noms de colonnes pour robustesse
     df.columns = [c.strip() for c in df.columns]
     # Unifier le nom de la colonne des finalistes (RUNNER) 
@@ -36,7 +36,7 @@ def load_data(path: str) -> pd.DataFrame:
     return df
 
 
-df_raw = load_data("data/df_nba_champion.xlsx")
+df_raw = load_data("nba_champion")
 
 #st.dataframe(df_raw)
 
@@ -65,6 +65,8 @@ def normalize_txt(s: str) -> str:
 
 def graphique_barres(data: pd.DataFrame, col_valeur: str, col_label: str, titre: str, col_couleur: str | None = None):
     """Graphique en barres horizontales (top to bottom) avec valeurs affichées."""
+    import plotly.express as px  # chargé au premier graphique, pas à l'ouverture de la page
+
     data_sorted = data.sort_values(by=col_valeur, ascending=False)  # ascending False pour barres du haut vers le bas
 
     kwargs = dict(
@@ -102,19 +104,42 @@ def graphique_barres(data: pd.DataFrame, col_valeur: str, col_label: str, titre:
 
 
 # -------------------------------
-# Préparation des colonnes normalisées
+# Graphiques du bilan des franchises (identiques pour tous : mis en cache par version)
 # -------------------------------
-df = df_raw.copy()
-for col in ["CHAMPION", "RUNNER", "FINALS_MVP", "POINTS", "REBOUNDS", "ASSISTS"]:
-    df[f"{col}_NORM"] = df[col].map(normalize_txt)
-
-# Colonne concaténée (pour le filtre joueur, recherche exacte et robuste)
-df["PLAYERS_ALL_NORM"] = (
-    df["FINALS_MVP_NORM"].fillna("") + "|" +
-    df["POINTS_NORM"].fillna("") + "|" +
-    df["REBOUNDS_NORM"].fillna("") + "|" +
-    df["ASSISTS_NORM"].fillna("")
-)
+def graphique_titres():
+    # Plus de titres par équipe (Top 10)
+    df = load_data("nba_champion")
+    titles_count = (
+        df.groupby("CHAMPION").size().reset_index(name="Titres").sort_values(by="Titres", ascending=False).head(10)
+    )
+    return graphique_barres(titles_count, col_valeur="Titres", col_label="CHAMPION", titre="Titres par équipe")
+
+
+def graphique_mvp():
+    # Plus de trophées Finals MVP par joueur (Top 10)
+    df = load_data("nba_champion")
+    mvp_count = (
+        df[df["FINALS_MVP"].notna()]
+        .groupby("FINALS_MVP").size().reset_index(name="Trophées MVP")
+        .sort_values(by="Trophées MVP", ascending=False).head(10)
+    )
+    return graphique_barres(mvp_count, col_valeur="Trophées MVP", col_label="FINALS_MVP", titre="Finals MVP — cumul")
+
+
+def graphique_participations():
+    # Plus de participations en finales par équipe (Top 10)
+    df = load_data("nba_champion")
+    team_appearances = (
+        pd.concat([
+            df[["CHAMPION"]].rename(columns={"CHAMPION": "Équipe"}),
+            df[["RUNNER"]].rename(columns={"RUNNER": "Équipe"}),
+        ])
+        .dropna()
+        .groupby("Équipe").size().reset_index(name="Participations")
+        .sort_values(by="Participations", ascending=False).head(10)
+    )
+    return graphique_barres(team_appearances, col_valeur="Participations", col_label="Équipe", titre="Participations en finales")
+
 
 # -------------------------------
 # Onglets
@@ -126,15 +151,15 @@ with onglet_hist:
     st.markdown("### Filtrer le palmarès")
 
     # Listes d'options (indépendantes, depuis le DF complet)
-    years = ["Toutes"] + sorted([y for y in df["YEAR"].dropna().unique().tolist()], reverse=True)
-    champs = ["Toutes"] + sorted([c for c in df["CHAMPION"].dropna().unique().tolist()])
-    runners = ["Toutes"] + sorted([r for r in df["RUNNER"].dropna().unique().tolist()])
+    years = ["Toutes"] + sorted([y for y in df_raw["YEAR"].dropna().unique().tolist()], reverse=True)
+    champs = ["Toutes"] + sorted([c for c in df_raw["CHAMPION"].dropna().unique().tolist()])
+    runners = ["Toutes"] + sorted([r for r in df_raw["RUNNER"].dropna().unique().tolist()])
     players = ["Toutes"] + sorted(
         pd.concat([
-            df["FINALS_MVP"].dropna(),
-            df["POINTS"].dropna(),
-            df["REBOUNDS"].dropna(),
-            df["ASSISTS"].dropna(),
+            df_raw["FINALS_MVP"].dropna(),
+            df_raw["POINTS"].dropna(),
+            df_raw["REBOUNDS"].dropna(),
+            df_raw["ASSISTS"].dropna(),
         ]).astype(str).unique().tolist()
     )
 
@@ -148,31 +173,35 @@ with onglet_hist:
     with col4:
         player_filter = st.selectbox("Sélectionner un joueur", players, key="player_hist")
 
-    # Application cumulative des filtres (AND)
-    filtered = df.copy()
-
-    def apply_eq(_df: pd.DataFrame, col: str, val):
-        return _df if val == "Toutes" else _df[_df[col] == val]
-
-    filtered = apply_eq(filtered, "YEAR", year_filter)
-    filtered = apply_eq(filtered, "CHAMPION", champ_filter)
-    filtered = apply_eq(filtered, "RUNNER", runner_filter)
-
-    if player_filter != "Toutes":
-        player_norm = normalize_txt(player_filter)
-        # Recherche exacte sur l'une des 4 colonnes (via split de la concat)
-        filtered = filtered[filtered["PLAYERS_ALL_NORM"].str.split("|").apply(lambda lst: player_norm in lst)]
+    # Application cumulative des filtres (AND) dans DuckDB — "Toutes" = pas de filtre
+    def valeur(val):
+        return None if val == "Toutes" else val
+
+    filtered = data.query(
+        """SELECT * FROM champions
+           WHERE ($year IS NULL OR YEAR = $year)
+             AND ($champ IS NULL OR CHAMPION = $champ)
+             AND ($runner IS NULL OR RUNNER = $runner)
+             -- Recherche exacte (minuscules, sans accents) sur l'une des 4 colonnes joueur
+             AND ($player IS NULL OR $player IN (
+                 strip_accents(lower(trim(FINALS_MVP))), strip_accents(lower(trim(POINTS))),
+                 strip_accents(lower(trim(REBOUNDS))), strip_accents(lower(trim(ASSISTS)))))
+           ORDER BY YEAR DESC""",
+        {
+            "year": valeur(year_filter),
+            "champ": valeur(champ_filter),
+            "runner": valeur(runner_filter),
+            "player": None if player_filter == "Toutes" else normalize_txt(player_filter),
+        }
+    )
 
     st.markdown("### Résultats")
 
-    # Colonnes techniques à masquer
-    tech_cols = [c for c in filtered.columns if c.endswith("_NORM") or c == "PLAYERS_ALL_NORM"]
-
     if filtered.empty:
         st.info("Aucun résultat pour cette combinaison de filtres.")
     else:
         st.dataframe(
-            filtered.drop(columns=tech_cols, errors="ignore"),
+            data.affichage(filtered),  # sans les clés d'équipe internes (CHAMP_KEY, RUNNER_UP_KEY)
             hide_index=True,
             use_container_width=True,
         )
@@ -181,46 +210,23 @@ with onglet_hist:
 with onglet_stats:
     st.markdown("### Vue d’ensemble — franchises")
 
-    # 1) Plus de titres par équipe (Top 10)
-    titles_count = (
-        df.groupby("CHAMPION").size().reset_index(name="Titres").sort_values(by="Titres", ascending=False).head(10)
-    )
-
-    # 2) Plus de trophées Finals MVP par joueur (Top 10)
-    mvp_count = (
-        df[df["FINALS_MVP"].notna()]
-        .groupby("FINALS_MVP").size().reset_index(name="Trophées MVP")
-        .sort_values(by="Trophées MVP", ascending=False).head(10)
-    )
-
-    # 3) Plus de participations en finales par équipe (Top 10)
-    team_appearances = (
-        pd.concat([
-            df[["CHAMPION"]].rename(columns={"CHAMPION": "Équipe"}),
-            df[["RUNNER"]].rename(columns={"RUNNER": "Équipe"}),
-        ])
-        .dropna()
-        .groupby("Équipe").size().reset_index(name="Participations")
-        .sort_values(by="Participations", ascending=False).head(10)
-    )
-
     # Affichages + graphiques
     left, mid, right = st.columns(3)
 
     with left:
         #st.markdown("#### Top 10 équipes par nombre de titres")
         #st.dataframe(titles_count, hide_index=True, use_container_width=True)
-        fig1 = graphique_barres(titles_count, col_valeur="Titres", col_label="CHAMPION", titre="Titres par équipe")
+        fig1 = figures.figure("champ_titres", graphique_titres)
         st.plotly_chart(fig1, use_container_width=True, theme="streamlit")
 
     with mid:
         #st.markdown("#### Top 10 joueurs avec le plus de Finals MVP")
         #st.dataframe(mvp_count, hide_index=True, use_container_width=True)
-        fig2 = graphique_barres(mvp_count, col_valeur="Trophées MVP", col_label="FINALS_MVP", titre="Finals MVP — cumul")
+        fig2 = figures.figure("champ_mvp", graphique_mvp)
         st.plotly_chart(fig2, use_container_width=True, theme="streamlit")
 
     with right:
         #st.markdown("#### Top 10 équipes par participations en finales")
         #st.dataframe(team_appearances, hide_index=True, use_container_width=True)
-        fig3 = graphique_barres(team_appearances, col_valeur="Participations", col_label="Équipe", titre="Participations en finales")
+        fig3 = figures.figure("champ_participations", graphique_participations)
         st.plotly_chart(fig3, use_container_width=True, theme="streamlit")
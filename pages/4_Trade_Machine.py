@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+from core import data, rules, trades, warmup
+from data_processing import teams
 
 
 # -------------------------------
@@ -14,6 +15,7 @@ with c2: st.page_link("pages/1_Team.py",           label=" Équipe")
 with c3: st.page_link("pages/2_Statistics.py",     label=" Statistiques")
 with c4: st.page_link("pages/3_Champ_Historic.py", label=" Historique")
 with c5: st.page_link("pages/4_Trade_Machine.py",  label=" Machine à Échanges")
+warmup.show_status()  # préchargement des caches en arrière-plan (core.warmup)
 
 
 # -------------------------------
@@ -23,188 +25,280 @@ st.set_page_config(page_title="Machine à Échanges de Joueurs", layout="wide")
 
 st.title(" Machine à Échanges NBA")
 
-st.write("Sélectionnez deux équipes et des joueurs pour simuler un échange. Les salaires seront comparés.")
+st.write("Sélectionnez deux à quatre équipes et des joueurs pour simuler un échange. Les salaires seront comparés.")
 
 
 
 # =========================================================
-# CACHES
+# DONNÉES
 # =========================================================
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_trade_machine_data():
-    df_ouest        = pd.read_excel("data/df_western_conf_standing.xlsx")
-    df_est          = pd.read_excel("data/df_eastern_conf_standing.xlsx")
-    df_classements  = pd.read_excel("data/df_nba_team_reg_season_ratings.xlsx")
-    df_joueurs_reg  = pd.read_excel("data/df_reg_season_players_filtered.xlsx")
-    df_joueurs_po   = pd.read_excel("data/df_playoff_players_filtered.xlsx")
-    df_salaires     = pd.read_excel("data/df_nba_players_salaries.xlsx")
-    return df_ouest, df_est, df_classements, df_joueurs_reg, df_joueurs_po, df_salaires
-
-# Utilisation
-df_ouest, df_est, df_classements_equipe, df_joueurs_reg, df_joueurs_po, df_salaires = load_trade_machine_data()
+# Jointure contrats x statistiques et effectifs : core.trades (une fois par version des données)
+@st.cache_resource(show_spinner=False, max_entries=256)
+def affichage_equipe(version: str, equipe: int, saison: str) -> pd.DataFrame:
+    """Tableau affiché pour une équipe et une saison: JOUEUR, années_contrat, Salaire, GUARANTEED."""
+    affichage = trades.pool_equipe(version, equipe)[["PLAYER", "contract_years", saison, "GUARANTEED"]]
+    affichage = affichage.rename(columns={saison: "Salaire"})
+    affichage["Salaire"] = affichage["Salaire"].map(formater_argent)
+    affichage["GUARANTEED"] = affichage["GUARANTEED"].map(formater_argent)
+    return affichage
 
 
 # -------------------------------
 # Fonctions
 # -------------------------------
-def salaire_cumule(pool_df: pd.DataFrame, saison: str, joueurs_selectionnes: list[str]) -> int:
-    """Retourne le salaire cumulé (déjà numérique) pour les joueurs sélectionnés."""
-    if not joueurs_selectionnes or pool_df is None or saison not in pool_df.columns:
-        return 0
-    return int(pool_df.loc[pool_df["PLAYER"].isin(joueurs_selectionnes), saison].sum())
-
 def formater_argent(montant: int) -> str:
     return f"${montant:,.0f}"
 
-# Étape 1: Compter combien d'années de contrat valides chaque joueur a
-annees_cols = ["2025-26","2026-27","2027-28","2028-29","2029-30","2030-31"]
-
-# Remplacer les espaces réservés comme "None", "-", "" par NaN
-df_salaires[annees_cols] = df_salaires[annees_cols].replace(
-    ["None", "", "-", "—"], pd.NA
-)
-
-# Créer une nouvelle colonne avec le nombre d'années de contrat non nulles
-df_salaires["contract_years"] = df_salaires[annees_cols].notna().sum(axis=1)
-
-# Étape 2: Créer un sous-ensemble propre de df_joueurs_reg avec seulement les colonnes pertinentes
-# Renommer PLAYER_NAME -> PLAYER pour s'aligner avec df_salaires
-stat_cols = ["POSITION","AST_PG","BLK_PG","AGE","FG_PCT","FG3_PCT",
-             "GP","MIN","PLUS_MINUS","PTS_PG","REB_PG","STL_PG","TOV_PG"]
-
-df_reg_subset = (
-    df_joueurs_reg
-      .rename(columns={"PLAYER_NAME": "PLAYER"})
-      [["PLAYER","TEAM"] + stat_cols]
-)
-
-# Étape 3: Fusionner les salaires et les statistiques des joueurs dans un seul dataframe
-df_jointures = df_salaires.merge(df_reg_subset, on=["PLAYER","TEAM"], how="left")
-
-# Prétraiter les colonnes de salaire: ne garder que les chiffres, convertir en int
-for col in annees_cols + ["GUARANTEED"]:
-    if col in df_jointures.columns:
-        df_jointures[col] = (
-            df_jointures[col]
-            .astype(str)
-            .str.replace(r"[^0-9]", "", regex=True)
-            .replace("", "0")
-            .astype(int)
+def nom_equipe(cle) -> str:
+    return "" if cle is None else teams.NAME[cle]
+
+def bande_saisons(validation: trades.Validation, saison: str):
+    """Bande des saisons 2025-26 à 2030-31 : écart et verdict des règles (core.rules) pour chacune."""
+    cases = []
+    for j, annee in enumerate(trades.ANNEES):
+        if not validation.sous_contrat[j]:
+            couleur, bordure, verdict = "#f2f2f2", "#cccccc", "Hors contrat"
+        elif validation.valide[j]:
+            couleur, bordure, verdict = "#e6ffe6", "#5cb85c", f"Valide ({validation.ecart[j]:.2%})"
+        else:
+            couleur, bordure, verdict = "#ffe6e6", "#ff4d4d", f"Invalide ({validation.ecart[j]:.2%})"
+        epaisseur = 3 if annee == saison else 1
+        cases.append(
+            f"""<div style="flex:1; background-color:{couleur}; padding:8px; border-radius:8px;
+                border:{epaisseur}px solid {bordure}; text-align:center;">
+                <b>{annee}</b><br>{verdict}<br>
+                <small>A {formater_argent(validation.total_a[j])} · B {formater_argent(validation.total_b[j])}</small>
+            </div>"""
         )
+    st.markdown(f"""<div style="display:flex; gap:6px; margin-bottom:12px;">{"".join(cases)}</div>""",
+                unsafe_allow_html=True)
 
-# -------------------------------
-# Ligne 1: sélecteur de saison
-# -------------------------------
-SAISONS = ["2025-26","2026-27","2027-28","2028-29","2029-30","2030-31"]
-saison = st.selectbox("Sélectionner la saison", SAISONS)
 
-# -------------------------------
-# Ligne 2: sélection d'équipe + joueur avec aperçu de l'effectif
-# -------------------------------
-colA, colB = st.columns(2)
+# =========================================================
+# FRAGMENTS
+# =========================================================
+# Chaque panneau d'équipe et le bloc de validation se relancent seuls : choisir un
+# joueur de l'Équipe B ne retraite rien pour l'Équipe A. Seuls les joueurs
+# sélectionnés sont partagés, via st.session_state ("joueursA" / "joueursB").
+@st.fragment
+def panneau_equipe(cote: str, equipe, saison: str):
+    """Effectif, sélection des joueurs et salaire cumulé d'un côté de l'échange."""
+    if equipe is None:
+        st.write("Veuillez sélectionner une équipe.")
+        st.metric(f"Salaire cumulé {cote}", formater_argent(0))
+        return
 
-liste_equipes = sorted(df_jointures["TEAM"].dropna().unique())
+    version = data.version()
+    pool = trades.pool_equipe(version, equipe)
+    st.dataframe(affichage_equipe(version, equipe, saison), hide_index=True, use_container_width=True)
 
-with colA:
-    st.subheader("Équipe A")
-    equipeA = st.selectbox("Choisir l'Équipe A", [""] + liste_equipes, key="equipeA")
-    joueursA = []
-    if equipeA == "":
-        st.write("Veuillez sélectionner une équipe.")
-    else:
-        poolA = df_jointures[df_jointures["TEAM"] == equipeA].copy()
+    # Sélection des joueurs (noms seulement; les détails sont affichés dans le tableau)
+    joueurs = st.multiselect(f"Sélectionner les joueurs de l'Équipe {cote}", pool["PLAYER"].tolist(), key=f"joueurs{cote}")
 
-        # Afficher: JOUEUR, années_contrat, Salaire (saison sélectionnée), GUARANTEED
-        affichageA = poolA[["PLAYER", "contract_years", saison, "GUARANTEED"]].copy()
-        affichageA = affichageA.rename(columns={saison: "Salaire"})
-        affichageA["Salaire"] = affichageA["Salaire"].map(formater_argent)
-        affichageA["GUARANTEED"] = affichageA["GUARANTEED"].map(formater_argent)
-        st.dataframe(affichageA, hide_index=True, use_container_width=True)
+    # Salaire cumulé (dynamique)
+    st.metric(f"Salaire cumulé {cote}", formater_argent(trades.salaire_cumule(version, pool, saison, joueurs)))
 
-        # Sélection des joueurs (noms seulement; les détails sont affichés dans le tableau)
-        joueursA = st.multiselect("Sélectionner les joueurs de l'Équipe A", poolA["PLAYER"].tolist(), key="joueursA")
+@st.fragment
+def validation_echange(equipeA, equipeB, saison: str):
+    """Essayer cet échange (règles de core.rules) sur toutes les saisons, à partir des joueurs sélectionnés de chaque côté."""
+    st.subheader("Validation de l'échange")
 
-with colB:
-    st.subheader("Équipe B")
-    # Supprimer l'Équipe A des options si sélectionnée
-    options_equipe_B = [""] + [t for t in liste_equipes if t != equipeA]
-    equipeB = st.selectbox("Choisir l'Équipe B", options_equipe_B, key="equipeB")
-    joueursB = []
-    if equipeB == "":
-        st.write("Veuillez sélectionner une équipe.")
+    clique = st.button("Essayer cet échange")
+    if not clique:
+        return
+
+    joueursA = st.session_state.get("joueursA", []) if equipeA is not None else []
+    joueursB = st.session_state.get("joueursB", []) if equipeB is not None else []
+
+    # Vérifications de base
+    if equipeA is None or equipeB is None:
+        st.warning("Veuillez d'abord sélectionner les deux équipes.")
+        return
+    if not joueursA or not joueursB:
+        st.warning("Veuillez sélectionner au moins un joueur de chaque équipe.")
+        return
+
+    # Recalculer les totaux au clic : toutes les saisons de contrat en une passe sur la matrice
+    version = data.version()
+    matrice = trades.contrats(version)
+    validation = trades.valider_saisons(
+        matrice,
+        equipeA, trades.lignes(trades.pool_equipe(version, equipeA), joueursA),
+        equipeB, trades.lignes(trades.pool_equipe(version, equipeB), joueursB),
+    )
+    bande_saisons(validation, saison)
+
+    i = matrice.saison(saison)
+    totalA, totalB = int(validation.total_a[i]), int(validation.total_b[i])
+    if totalA <= 0 or totalB <= 0:
+        st.info("Les joueurs sélectionnés doivent avoir un salaire pour la saison choisie.")
+        return
+
+    diff_pct = validation.ecart[i]
+
+    # Afficher les métriques dans 3 colonnes propres
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Équipe A", formater_argent(totalA))
+    col2.metric("Équipe B", formater_argent(totalB))
+    col3.metric("Différence", f"{diff_pct:.2%}")
+
+    # Vérification des règles métier (core.rules) ; plages acceptables selon le palier de chaque équipe
+    a_min, a_max = rules.bande(totalA)  # total de B acceptable face à A
+    b_min, b_max = rules.bande(totalB)  # total de A acceptable face à B
+    if validation.valide[i]:
+        st.success(f" L'échange est valide selon la règle de correspondance des salaires ({rules.REGLES.libelle()}).")
+    elif a_min <= totalB <= a_max and b_min <= totalA <= b_max:
+        st.error(" Échange invalide : " + " ; ".join(validation.motifs[i]))
     else:
-        poolB = df_jointures[df_jointures["TEAM"] == equipeB].copy()
+        # Afficher les plages acceptables
+        st.markdown(
+            f"""
+        <div style="background-color:#ffe6e6; padding:15px; border-radius:10px; border:1px solid #ff4d4d;">
+            <b> Échange invalide: les totaux ne respectent pas la règle des salaires ({rules.REGLES.libelle()}).</b><br><br>
+            • Pour correspondre à l'<b>Équipe A</b>: le total de l'Équipe B doit être entre
+            <span style="color:#d9534f;">{formater_argent(a_min)}</span> et <span style="color:#d9534f;">{formater_argent(a_max)}</span><br>
+            • Pour correspondre à l'<b>Équipe B</b>: le total de l'Équipe A doit être entre
+            <span style="color:#d9534f;">{formater_argent(b_min)}</span> et <span style="color:#d9534f;">{formater_argent(b_max)}</span>
+        </div>
+        """,
+            unsafe_allow_html=True
+        )
 
-        affichageB = poolB[["PLAYER", "contract_years", saison, "GUARANTEED"]].copy()
-        affichageB = affichageB.rename(columns={saison: "Salaire"})
-        affichageB["Salaire"] = affichageB["Salaire"].map(formater_argent)
-        affichageB["GUARANTEED"] = affichageB["GUARANTEED"].map(formater_argent)
-        st.dataframe(affichageB, hide_index=True, use_container_width=True)
 
-        joueursB = st.multiselect("Sélectionner les joueurs de l'Équipe B", poolB["PLAYER"].tolist(), key="joueursB")
+# Libellés des critères de classement des échanges trouvés (trades.STATS_ECHANGE)
+CRITERES = {"Points par match": "PTS_PG", "Rebonds par match": "REB_PG",
+            "Passes par match": "AST_PG", "Plus/Minus": "PLUS_MINUS"}
+
+@st.fragment
+def recherche_echanges(equipeA, saison: str):
+    """Trouver des échanges : contreparties possibles dans les 29 autres effectifs pour les joueurs de l'Équipe A."""
+    st.subheader("Trouver des échanges dans la ligue")
+    st.write("Cherche, dans tous les autres effectifs, les combinaisons de joueurs dont le salaire cumulé "
+             f"respecte la règle des salaires ({rules.REGLES.libelle()}) face aux joueurs sélectionnés de l'Équipe A.")
+
+    col1, col2 = st.columns(2)
+    critere = col1.selectbox("Classer par", list(CRITERES), key="critere_recherche")
+    max_joueurs = col2.slider("Joueurs reçus (maximum)", 1, trades.MAX_JOUEURS, 3, key="max_joueurs_recherche")
+    if not st.button("Chercher des échanges"):
+        return
+
+    joueursA = st.session_state.get("joueursA", []) if equipeA is not None else []
+    if equipeA is None or not joueursA:
+        st.warning("Veuillez d'abord sélectionner l'Équipe A et au moins un de ses joueurs.")
+        return
+
+    resultats = trades.trouver_echanges(data.version(), equipeA, saison, joueursA,
+                                        critere=CRITERES[critere], max_joueurs=max_joueurs)
+    if resultats.empty:
+        st.info(f"Aucune combinaison ne respecte la règle des salaires ({rules.REGLES.libelle()}) pour cette saison.")
+        return
+
+    affichage = pd.DataFrame({
+        "Équipe": resultats["TEAM_KEY"].map(teams.NAME),
+        "Joueurs reçus": resultats["PLAYERS"].map(", ".join),
+        "Salaire": resultats["SALARY"].map(formater_argent),
+        "Différence": resultats["DIFF_PCT"].map("{:.2%}".format),
+        **{libelle: resultats[col].round(1) for libelle, col in CRITERES.items()},
+    })
+    st.dataframe(affichage, hide_index=True, use_container_width=True)
+
+
+# Échange à trois ou quatre équipes : chaque joueur cédé reçoit une destination.
+# Tout le bloc est un fragment : changer une destination ne relance que lui.
+MODES = ["Deux équipes", "Trois ou quatre équipes"]
+
+def verdict(ecart: float, valide: bool) -> str:
+    if pd.isna(ecart):
+        return "—"
+    return f"{'Valide' if valide else 'Invalide'} ({ecart:.2%})"
+
+@st.fragment
+def echange_multi(liste_equipes: list, saison: str):
+    """Échange à 3 ou 4 équipes : salaires reçus contre salaires cédés, pour chaque équipe et chaque saison."""
+    equipes = st.multiselect("Équipes de l'échange (3 ou 4)", liste_equipes, format_func=nom_equipe,
+                             max_selections=4, key="equipes_multi")
+    if len(equipes) < 3:
+        st.info("Veuillez sélectionner trois ou quatre équipes.")
+        return
+
+    version = data.version()
+    rows, destinations = [], []
+    for col, equipe in zip(st.columns(len(equipes)), equipes):
+        with col:
+            st.subheader(nom_equipe(equipe))
+            pool = trades.pool_equipe(version, equipe)
+            joueurs = st.multiselect("Joueurs cédés", pool["PLAYER"].tolist(), key=f"multi_joueurs_{equipe}")
+            autres = [e for e in equipes if e != equipe]
+            for joueur in joueurs:
+                destination = st.selectbox(f"Destination de {joueur}", autres, format_func=nom_equipe,
+                                           key=f"multi_destination_{equipe}_{joueur}")
+                rows.append(int(pool.loc[pool["PLAYER"] == joueur, "ROW"].iloc[0]))
+                destinations.append(destination)
+
+    if not rows:
+        st.info("Veuillez sélectionner les joueurs cédés par chaque équipe.")
+        return
+
+    # Bilan de toutes les équipes, toutes saisons, en un seul calcul
+    bilan = trades.bilan_equipes(trades.contrats(version), equipes, rows, destinations)
+    i = trades.ANNEES.index(saison)
+    st.subheader("Validation de l'échange")
+    st.dataframe(pd.DataFrame({
+        "Équipe": [nom_equipe(e) for e in equipes],
+        "Salaires cédés": [formater_argent(v) for v in bilan.sortant[:, i]],
+        "Salaires reçus": [formater_argent(v) for v in bilan.entrant[:, i]],
+        **{annee: [verdict(e, ok) for e, ok in zip(bilan.ecart[:, j], bilan.valide[:, j])]
+           for j, annee in enumerate(trades.ANNEES)},
+    }), hide_index=True, use_container_width=True)
+
+    if bilan.echange_valide[i]:
+        st.success(f" L'échange est valide pour {saison} : chaque équipe respecte la règle des salaires "
+                   f"({rules.REGLES.libelle()}).")
+    else:
+        st.error(f" Échange invalide pour {saison} : " + " ; ".join(bilan.motifs[i]))
 
 
 # -------------------------------
-# Ligne 3: salaire cumulé (dynamique)
+# Ligne 1: type d'échange et sélecteur de saison
 # -------------------------------
+mode = st.radio("Type d'échange", MODES, key="mode_echange", horizontal=True)
+saison = st.selectbox("Sélectionner la saison", trades.ANNEES, key="saison")
+
+liste_equipes = sorted(trades.jointures(data.version())["TEAM_KEY"].dropna().unique(), key=teams.NAME.get)
+
+if mode == MODES[1]:
+    st.divider()
+    echange_multi(liste_equipes, saison)
+    st.stop()
+
+# -------------------------------
+# Ligne 2: sélection d'équipe + joueurs avec aperçu de l'effectif et salaire cumulé
+# -------------------------------
+# Changer d'équipe ou de saison relance toute la page (les options de B dépendent de A)
 colA, colB = st.columns(2)
 
 with colA:
-    totalA = salaire_cumule(poolA if 'poolA' in locals() else None, saison, joueursA if 'joueursA' in locals() else [])
-    st.metric("Salaire cumulé A", formater_argent(totalA))
+    st.subheader("Équipe A")
+    equipeA = st.selectbox("Choisir l'Équipe A", [None] + liste_equipes, format_func=nom_equipe, key="equipeA")
+    panneau_equipe("A", equipeA, saison)
 
 with colB:
-    totalB = salaire_cumule(poolB if 'poolB' in locals() else None, saison, joueursB if 'joueursB' in locals() else [])
-    st.metric("Salaire cumulé B", formater_argent(totalB))
-
+    st.subheader("Équipe B")
+    # Supprimer l'Équipe A des options si sélectionnée
+    options_equipe_B = [None] + [t for t in liste_equipes if t != equipeA]
+    equipeB = st.selectbox("Choisir l'Équipe B", options_equipe_B, format_func=nom_equipe, key="equipeB")
+    panneau_equipe("B", equipeB, saison)
 
 
 # -------------------------------
-# Ligne 4: Essayer cet échange (règle de +/- 5%)
+# Ligne 3: Essayer cet échange (règles de core.rules)
 # -------------------------------
 st.divider()
-st.subheader("Validation de l'échange")
+validation_echange(equipeA, equipeB, saison)
 
-clique = st.button("Essayer cet échange")
 
-if clique:
-    # Vérifications de base
-    if equipeA == "" or equipeB == "":
-        st.warning("Veuillez d'abord sélectionner les deux équipes.")
-    elif not joueursA or not joueursB:
-        st.warning("Veuillez sélectionner au moins un joueur de chaque équipe.")
-    else:
-        # Recalculer les totaux au clic
-        totalA = salaire_cumule(poolA if 'poolA' in locals() else None, saison, joueursA)
-        totalB = salaire_cumule(poolB if 'poolB' in locals() else None, saison, joueursB)
-
-        if totalA <= 0 or totalB <= 0:
-            st.info("Les joueurs sélectionnés doivent avoir un salaire pour la saison choisie.")
-        else:
-            diff_pct = abs(totalA - totalB) / max(totalA, totalB)
-
-            # Afficher les métriques dans 3 colonnes propres
-            col1, col2, col3 = st.columns(3)
-            col1.metric("Équipe A", formater_argent(totalA))
-            col2.metric("Équipe B", formater_argent(totalB))
-            col3.metric("Différence", f"{diff_pct:.2%}")
-
-            # Vérification de la règle métier
-            if diff_pct <= 0.05:
-                st.success(" L'échange est valide selon la règle de correspondance des salaires de ±5%.")
-            else:
-                # Afficher les plages acceptables
-                a_min, a_max = int(totalA * 0.95), int(totalA * 1.05)
-                b_min, b_max = int(totalB * 0.95), int(totalB * 1.05)
-                st.markdown(
-                    f"""
-                <div style="background-color:#ffe6e6; padding:15px; border-radius:10px; border:1px solid #ff4d4d;">
-                    <b> Échange invalide: les totaux diffèrent de plus de 5%.</b><br><br>
-                    • Pour correspondre à l'<b>Équipe A</b>: le total de l'Équipe B doit être entre
-                    <span style="color:#d9534f;">{formater_argent(a_min)}</span> et <span style="color:#d9534f;">{formater_argent(a_max)}</span><br>
-                    • Pour correspondre à l'<b>Équipe B</b>: le total de l'Équipe A doit être entre
-                    <span style="color:#d9534f;">{formater_argent(b_min)}</span> et <span style="color:#d9534f;">{formater_argent(b_max)}</span>
-                </div>
-                """,
-                    unsafe_allow_html=True
-                )
\ No newline at end of file
+# -------------------------------
+# Ligne 4: Trouver des échanges (toute la ligue)
+# -------------------------------
+st.divider()
+recherche_echanges(equipeA, saison)